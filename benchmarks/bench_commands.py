@@ -0,0 +1,168 @@
+#!/usr/bin/env python3.11
+# Load test of the command handlers with fake Interactions and local stand-ins of zenquotes, Reddit, the CDN and Dropbox
+# Usage: python3.11 benchmarks/bench_commands.py --concurrency 1 10 50 --operations 200 --latency reddit=0.2 --failure zenquotes=0.05
+import random
+import asyncio
+import logging
+import argparse
+import time
+
+import harness
+from harness import index
+
+# Commands with their arguments, the admin commands are used by a member with the Owner Role
+commands = {
+    "help": {},
+    "hello": {},
+    "starwarsstatic": {},
+    "reddit": {"subreddit": "pics"},
+    "meme": {},
+    "starwars": {},
+    "gif": {},
+    "art": {},
+    "dataisbeautiful": {},
+    "qod": {},
+    "quote": {},
+    "vipstatus": {},
+    "expiredvips": {},
+    "vipupdate": {},
+    "ip": {},
+    "vote": {},
+    "botstats": {},
+    "donate": {},
+}
+admin_commands = ("expiredvips", "vipupdate", "botstats")
+
+
+# Function to parse "upstream=value" arguments
+def upstream_value(argument: str):
+    upstream, _, value = argument.partition("=")
+    if upstream not in harness.UpstreamStandIn.upstreams:
+        raise argparse.ArgumentTypeError(f"unknown upstream {upstream}, use one of {', '.join(harness.UpstreamStandIn.upstreams)}")
+    return upstream, float(value)
+
+
+# Function to forget everything the bot has cached, so the next command has to ask the upstream services again
+def reset_caches():
+    index.quote_of_the_day.update({"date": None, "quote": None})
+    index.quote_pool.clear()
+    index.quote_backoff_until = 0
+    index.media_cache.clear()
+    index.media_cache_stats["bytes"] = 0
+    index.media_attachments.clear()
+    index.media_probe_cache.clear()
+    index.reddit_subreddit_cache.clear()
+    index.reddit_hot_cache.clear()
+    for pool in index.reddit_prefetch_pools.values():
+        pool.clear()
+    index.vip_roster.update({"rev": None, "content_hash": None, "checked": 0, "rows": None})
+
+
+# Function to run a command a number of times with a number of concurrent users
+async def run_command(name: str, operations: int, concurrency: int, guild, rng):
+    command = getattr(index, name)
+    admin = guild.get_member(1000)
+    channel = guild.get_channel(1047547059433119777)
+    latencies = []
+    started = 0
+    errors = 0
+
+    async def _user():
+        nonlocal started, errors
+        while started < operations:
+            started += 1
+            user = admin if name in admin_commands else rng.choice(guild.members)
+            interaction = harness.FakeInteraction(command, user, guild, channel)
+            time_start = time.perf_counter()
+            try:
+                await command.callback(interaction, **commands[name])
+            except Exception:
+                interaction.extras["outcome"] = "error"
+            latencies.append(time.perf_counter() - time_start)
+            if interaction.extras.get("outcome") != "success":
+                errors += 1
+
+    time_start = time.perf_counter()
+    await asyncio.gather(*(_user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - time_start
+
+
+async def main(args):
+    # Exceptions of the failure injection are expected, only show them if asked for
+    if not args.verbose:
+        index.log.addHandler(logging.NullHandler())
+        index.log.propagate = False
+
+    rng = random.Random(args.seed)
+    harness.discord_rest_latency = args.discord_latency
+    standin = await harness.UpstreamStandIn(latency=dict(args.latency), failure_rate=dict(args.failure),
+                                            roster=harness.write_synthetic_roster(args.roster_rows, args.seed, args.members),
+                                            seed=args.seed).start()
+    guild = harness.fake_guild(args.members, args.seed)
+    guild.get_channel(index.vip_purchase_channel_id).messages = harness.fake_purchase_messages(guild, args.purchases, args.seed)
+    harness.install(guild, standin)
+    index.admission_enabled = args.admission
+    index.client.http_session = index._http_session_create()
+    index._member_index_build(guild)
+
+    # The background tasks of the bot keep the quote and Reddit pools filled
+    background_tasks = []
+    if args.background:
+        background_tasks = [asyncio.create_task(index._quote_pool_loop()), asyncio.create_task(index._reddit_prefetch_loop())]
+
+    monitor = harness.StallMonitor(threshold=args.stall_threshold)
+    monitor.start()
+    try:
+        print(f"{'command':<16} {'conc':>5} {'ops':>6} {'err':>5} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'stalls':>7} {'max stall ms':>13}")
+        for name in args.commands:
+            for concurrency in args.concurrency:
+                await run_command(name, args.warmup, min(concurrency, args.warmup) or 1, guild, rng)
+                if args.cold:
+                    reset_caches()
+                monitor.take()
+
+                latencies, errors, elapsed = await run_command(name, args.operations, concurrency, guild, rng)
+                stalls = monitor.take()
+
+                # The timings of a command which always fails only measure its error path
+                if latencies and errors == len(latencies):
+                    raise RuntimeError(f"Every {name} operation failed with concurrency {concurrency}, run with --verbose to see the exception")
+                print(f"{name:<16} {concurrency:>5} {len(latencies):>6} {errors:>5} {len(latencies) / elapsed:>8.1f} "
+                      f"{harness.percentile(latencies, 0.5) * 1000:>8.1f} {harness.percentile(latencies, 0.95) * 1000:>8.1f} "
+                      f"{harness.percentile(latencies, 0.99) * 1000:>8.1f} {len(stalls):>7} {max(stalls, default=0) * 1000:>13.1f}")
+
+        print()
+        print("Upstream requests: " + ", ".join(f"{upstream} {standin.requests[upstream]} ({standin.failures[upstream]} failed)"
+                                                for upstream in standin.upstreams))
+        print(f"Blocking executor peak: {index.blocking_executor_stats['peak']}, timeouts: {index.blocking_executor_stats['timeouts']}")
+    finally:
+        await monitor.stop()
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        if index.reddit_client is not None:
+            await index.reddit_client.close()
+        await index.client.http_session.close()
+        await standin.stop()
+        index.blocking_executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the command handlers against local stand-ins")
+    parser.add_argument("--commands", nargs="+", choices=commands, default=list(commands))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--operations", type=int, default=200, help="measured operations per command and concurrency")
+    parser.add_argument("--warmup", type=int, default=5, help="operations before measuring, 0 to measure cold caches")
+    parser.add_argument("--cold", action="store_true", help="forget all caches before measuring every command and concurrency")
+    parser.add_argument("--background", action="store_true", help="run the quote and Reddit prefetch tasks")
+    parser.add_argument("--latency", type=upstream_value, action="append", default=[], metavar="UPSTREAM=SECONDS")
+    parser.add_argument("--failure", type=upstream_value, action="append", default=[], metavar="UPSTREAM=RATE")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="seconds of every fake Discord REST call")
+    parser.add_argument("--roster-rows", type=int, default=2000)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--purchases", type=int, default=500, help="messages in the Tip4Server VIP channel")
+    parser.add_argument("--stall-threshold", type=float, default=0.05, help="event loop lag in seconds which counts as stall")
+    parser.add_argument("--admission", action="store_true", help="keep the rate limits of the bot, rejected commands count as errors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the log of the bot")
+    asyncio.run(main(parser.parse_args()))
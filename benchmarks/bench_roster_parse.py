@@ -0,0 +1,91 @@
+#!/usr/bin/env python3.11
+# Benchmark of the VIP Excel Sheet parser against the previous pandas/JSON parser
+# Usage: python3.11 benchmarks/bench_roster_parse.py --rows 1000 10000 50000 --repeat 3
+import io
+import json
+import argparse
+import statistics
+import timeit
+
+import pandas
+
+from harness import index, write_synthetic_roster
+
+#########################################################################################
+# Previous Parser
+#########################################################################################
+
+# The pandas parser which was used before, including the JSON round-trip
+def legacy_roster_parse(content: bytes):
+    dropbox_excel = pandas.read_excel(io.BytesIO(content), header=3)
+    excel_output = pandas.DataFrame(data=dropbox_excel)
+    excel_json = json.loads(excel_output.to_json())
+    discord_usernames = excel_json.get("Unnamed: 2")
+
+    by_discord = {}
+    by_steam = {}
+    for key, discord_username in discord_usernames.items():
+        if discord_username is not None and discord_username not in by_discord:
+            by_discord[discord_username] = key
+        steam_id = excel_output["Unnamed: 7"].values[int(key)]
+        if not pandas.isna(steam_id):
+            by_steam.setdefault(str(steam_id), key)
+
+    return {
+        "excel": excel_output,
+        "discord_usernames": discord_usernames,
+        "by_discord": by_discord,
+        "by_steam": by_steam,
+    }
+
+# Function to receive the values of a row like the previous handlers used them
+def legacy_row_values(legacy, key: int):
+    """Returns (Game Name, Discord Name, End Date, Steam ID) with None for empty cells and 00:00:00 End Dates"""
+    excel_output = legacy["excel"]
+    game_name, end_date, steam_id = (excel_output[column].values[key] for column in ("Unnamed: 1", "Unnamed: 4", "Unnamed: 7"))
+    discord_name = legacy["discord_usernames"][str(key)]
+
+    # Text cells like the "End Date" header row below the used header count as rows without End Date
+    end_date = None if str(end_date) == "00:00:00" else pandas.to_datetime(end_date, errors="coerce")
+    end_date = None if pandas.isna(end_date) else end_date.to_pydatetime()
+    return (None if pandas.isna(game_name) else game_name,
+            None if discord_name is None else str(discord_name),
+            end_date,
+            None if pandas.isna(steam_id) else steam_id)
+
+#########################################################################################
+# Benchmark
+#########################################################################################
+
+# Function to time a parser, returns the timings in seconds
+def measure(parser, content: bytes, repeat: int):
+    return timeit.repeat(lambda: parser(content), repeat=repeat, number=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the VIP Excel Sheet parser")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'size':>9} {'pandas (s)':>11} {'openpyxl (s)':>13} {'speedup':>8}")
+    for rows in args.rows:
+        content = write_synthetic_roster(rows)
+
+        # Both parsers have to find the same rows with the same values
+        legacy = legacy_roster_parse(content)
+        streaming = index._vip_roster_parse(content)
+        if len(legacy["discord_usernames"]) != len(streaming["rows"]):
+            print(f" > Row count differs for {rows} rows: pandas {len(legacy['discord_usernames'])}, openpyxl {len(streaming['rows'])}")
+        else:
+            # Values are compared as the handlers print them, 7.6561198e+16 equals 76561198000000016 as a number
+            for key, row in enumerate(streaming["rows"]):
+                if list(map(str, legacy_row_values(legacy, key))) != list(map(str, row)):
+                    print(f" > Row {key} differs for {rows} rows: pandas {legacy_row_values(legacy, key)}, openpyxl {tuple(row)}")
+                    break
+            if set(legacy["by_steam"]) != set(streaming["by_steam"]):
+                print(f" > Steam IDs differ for {rows} rows: {len(set(legacy['by_steam']) ^ set(streaming['by_steam']))} only found by one parser")
+
+        legacy_time = statistics.median(measure(legacy_roster_parse, content, args.repeat))
+        streaming_time = statistics.median(measure(index._vip_roster_parse, content, args.repeat))
+        print(f"{rows:>8} {len(content) // 1024:>7}kB {legacy_time:>11.3f} {streaming_time:>13.3f} {legacy_time / streaming_time:>7.1f}x")
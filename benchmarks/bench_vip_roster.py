@@ -0,0 +1,99 @@
+#!/usr/bin/env python3.11
+# Scaling benchmark of the VIP commands, every stage is timed separately for each size of the VIP Excel Sheet
+# Usage: python3.11 benchmarks/bench_vip_roster.py --rows 5000 50000 200000 --members 20000
+import os
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import multiprocessing
+from datetime import datetime
+
+import harness
+from harness import index
+
+
+# Function to receive the peak RSS of this process in MB, Linux reports it in kB
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Function to run one VIP command with a fake Interaction of the Admin
+async def run_vip_command(name: str, guild):
+    command = getattr(index, name)
+    interaction = harness.FakeInteraction(command, guild.get_member(1000), guild, guild.get_channel(1047547059433119777))
+    await command.callback(interaction)
+    if interaction.extras["outcome"] != "success":
+        raise RuntimeError(f"{name} failed, run with --verbose to see the exception")
+
+
+async def measure_size(rows: int, members: int, seed: int, save_dir: str):
+    """Returns a list of (stage, seconds, peak RSS in MB)"""
+    stages = []
+
+    # Function to time a stage and remember the peak RSS after it
+    async def _stage(stage, function, *args):
+        time_start = time.perf_counter()
+        result = function(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        stages.append((stage, time.perf_counter() - time_start, peak_rss()))
+        return result
+
+    content = await _stage("generate", harness.write_synthetic_roster, rows, seed, members)
+    if save_dir:
+        with open(os.path.join(save_dir, f"vip_roster_{rows}.xlsx"), "wb") as roster_file:
+            roster_file.write(content)
+
+    standin = await harness.UpstreamStandIn(roster=content, seed=seed).start()
+    guild = harness.fake_guild(members, seed)
+    harness.install(guild, standin)
+    index.client.http_session = index._http_session_create()
+    try:
+        # Member Name Index of the Guild, the roster is still empty
+        await _stage("member_index", index._member_index_build, guild)
+
+        # Parse the sheet like _vip_roster_refresh, the stand-in keeps the same revision afterwards
+        parsed_roster = await _stage("parse", index._vip_roster_parse, content)
+        index.vip_roster.update(parsed_roster)
+        index.vip_roster.update({"rev": standin.roster_rev, "content_hash": standin.roster_hash, "checked": time.monotonic()})
+
+        # Link the Discord Names of the roster to members
+        await _stage("member_resolve", index._vip_roster_link_members)
+        await _stage("classify", index._vip_roster_classify, index.vip_roster, datetime.now(), 10, 20)
+
+        # The report building of the commands, vipupdate also asks Dropbox for the revision and changes the VIP Roles
+        await _stage("expiredvips", run_vip_command, "expiredvips", guild)
+        await _stage("vipupdate", run_vip_command, "vipupdate", guild)
+        await _stage("vipupdate_again", run_vip_command, "vipupdate", guild)
+    finally:
+        await index.client.http_session.close()
+        await standin.stop()
+    return stages
+
+
+# Function which runs in a new process for every size, so the peak RSS of one size does not hide the next one
+def run_size(arguments):
+    rows, members, seed, save_dir, verbose = arguments
+    if not verbose:
+        index.log.addHandler(logging.NullHandler())
+        index.log.propagate = False
+    return rows, asyncio.run(measure_size(rows, members, seed, save_dir))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the VIP commands")
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 50000, 200000])
+    parser.add_argument("--members", type=int, default=20000, help="members of the fake Feierabend Guild")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="DIR", help="keep the generated VIP Excel Sheets in this folder")
+    parser.add_argument("--verbose", action="store_true", help="show the log of the bot")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'stage':<16} {'seconds':>9} {'peak RSS':>10}")
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for rows, stages in pool.imap(run_size, [(rows, args.members, args.seed, args.save, args.verbose) for rows in args.rows]):
+            for stage, seconds, rss in stages:
+                print(f"{rows:>8} {stage:<16} {seconds:>9.3f} {rss:>8.0f}MB")
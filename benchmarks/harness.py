@@ -0,0 +1,501 @@
+# Shared parts of the benchmarks: synthetic data, fake Discord objects and local stand-ins of the upstream services
+import os
+import sys
+import io
+import json
+import random
+import asyncio
+import hashlib
+import tempfile
+import urllib.request
+from collections import Counter
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+import openpyxl
+from aiohttp import web
+from discord import utils
+
+# index.py reads config.json from the working directory
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(repo_path)
+sys.path.insert(0, repo_path)
+import index
+
+#########################################################################################
+# Synthetic VIP Excel Sheet
+#########################################################################################
+
+# Function to create a VIP Excel Sheet with the layout of the real one
+def write_synthetic_roster(rows: int, seed: int = 0, members: int = None):
+    """Returns the bytes of an .xlsx file with a mix of active, expired, empty and 00:00:00 End Dates
+
+    The Discord Names belong to the members of fake_guild(members): renewals repeat a name, some rows use the
+    old name#discriminator tag or the global name and some belong to members which have left the guild."""
+    rng = random.Random(seed)
+    members = members or rows
+    time_now = datetime.now().replace(microsecond=0)
+
+    # Write only mode streams the rows, the real sheet can have hundreds of thousands of them
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+
+    # Title rows and header, the used columns have no header text ("Unnamed: N" in pandas)
+    worksheet.append(["Feierabend VIP List"])
+    worksheet.append(["Generated", str(time_now)])
+    worksheet.append(["Rows", rows])
+    worksheet.append(["Nr", None, None, "Start", None, "Package", "Paid", None])
+    worksheet.append(["#", "Game Name", "Discord Name", "Start Date", "End Date", "Package", "Paid", "Steam ID"])
+
+    for row in range(rows):
+        kind = rng.random()
+        if kind < 0.45:
+            end_date = time_now + timedelta(days=rng.randint(0, 90), hours=rng.randint(0, 23))
+        elif kind < 0.85:
+            end_date = time_now - timedelta(days=rng.randint(1, 400), hours=rng.randint(0, 23))
+        elif kind < 0.93:
+            end_date = time(0, 0)
+        else:
+            end_date = None
+
+        member = rng.randrange(members)
+        name_kind = rng.random()
+        if name_kind < 0.75:
+            discord_name = f"vip_user_{member}"
+        elif name_kind < 0.8:
+            discord_name = f"vip_user_{member}#{fake_discriminator(member)}"
+        elif name_kind < 0.85:
+            discord_name = f"Player {member}"
+        elif name_kind < 0.9:
+            discord_name = f"left_user_{row}"
+        else:
+            discord_name = None
+
+        worksheet.append([row + 1,
+                          f"Player{member}",
+                          discord_name,
+                          time_now - timedelta(days=rng.randint(30, 500)),
+                          end_date,
+                          rng.choice(("VIP", "VIP+", "VIP++")),
+                          rng.choice((5, 10, 20)),
+                          76561198000000000 + member if rng.random() < 0.97 else None])
+
+    content = io.BytesIO()
+    workbook.save(content)
+    return content.getvalue()
+
+#########################################################################################
+# Fake Discord Objects
+#########################################################################################
+
+# Latency of every fake Discord REST call (defer, send, edit, role changes) in seconds
+discord_rest_latency = 0.0
+
+# Function to wait like a Discord REST call
+async def _discord_rest():
+    if discord_rest_latency > 0:
+        await asyncio.sleep(discord_rest_latency)
+
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+        self._members = {}
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def mention(self):
+        return f"<@&{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMember:
+    def __init__(self, member_id: int, name: str, discriminator: str = "0", global_name: str = None, nick: str = None, roles = ()):
+        self.id = member_id
+        self.name = name
+        self.discriminator = discriminator
+        self.global_name = global_name
+        self.nick = nick
+        self.bot = False
+        self.roles = []
+        for role in roles:
+            self._role_add(role)
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    def _role_add(self, role):
+        if role not in self.roles:
+            self.roles.append(role)
+            role._members[self.id] = self
+
+    async def add_roles(self, *roles, reason = None):
+        await _discord_rest()
+        for role in roles:
+            self._role_add(role)
+
+    async def remove_roles(self, *roles, reason = None):
+        await _discord_rest()
+        for role in roles:
+            if role in self.roles:
+                self.roles.remove(role)
+                role._members.pop(self.id, None)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, content: str = None, attachments = ()):
+        self.id = message_id
+        self.content = content
+        self.attachments = list(attachments)
+
+    async def edit(self, content = None, **kwargs):
+        await _discord_rest()
+        self.content = content
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, messages = ()):
+        self.id = channel_id
+        self.messages = list(messages)
+        self.sent = 0
+
+    async def send(self, content = None, **kwargs):
+        await _discord_rest()
+        self.sent += 1
+        return FakeMessage(utils.time_snowflake(utils.utcnow()), content)
+
+    async def history(self, limit = None, after = None, oldest_first = False):
+        await _discord_rest()
+        for message in self.messages:
+            if after is None or message.id > after.id:
+                yield message
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str, members, roles, me):
+        self.id = guild_id
+        self.name = name
+        self.members = list(members)
+        self.roles = list(roles)
+        self.me = me
+        self.channels = {}
+        self._member_ids = {member.id: member for member in self.members}
+
+    def get_member(self, member_id: int):
+        return self._member_ids.get(member_id)
+
+    # Every channel exists, they are created when they are used for the first time
+    def get_channel(self, channel_id: int):
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(channel_id)
+        return self.channels[channel_id]
+
+    def __str__(self):
+        return self.name
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        await _discord_rest()
+        self._done = True
+
+    async def send_message(self, content = None, *, file = None, **kwargs):
+        await _discord_rest()
+        self._done = True
+        attachments = [SimpleNamespace(url=f"https://cdn.discordapp.com/attachments/0/{self._interaction.id}/{file.filename}")] if file else []
+        self._interaction._original = FakeMessage(self._interaction.id, content, attachments)
+
+
+class FakeFollowup:
+    async def send(self, content = None, *, wait = False, **kwargs):
+        await _discord_rest()
+        return FakeMessage(utils.time_snowflake(utils.utcnow()), content) if wait else None
+
+
+class FakeInteraction:
+    def __init__(self, command, user, guild, channel):
+        self.id = utils.time_snowflake(utils.utcnow())
+        self.command = command
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.created_at = utils.utcnow()
+        self.extras = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup()
+        self._original = None
+
+    async def original_response(self):
+        await _discord_rest()
+        return self._original
+
+
+# Function to receive the discriminator of a fake member, used for the old name#discriminator tags
+def fake_discriminator(member: int):
+    return f"{member % 9000 + 1000}"
+
+
+# Function to create the Feierabend Guild with members named like the Discord Names of the synthetic VIP Excel Sheet
+def fake_guild(members: int, seed: int = 0):
+    """Every 10th member has changed the username, every 4th member holds the VIP Role and the first member is an Admin"""
+    rng = random.Random(seed)
+    roles = {name: FakeRole(role_id, name) for role_id, name in enumerate(
+        ("Owner", "Admin", "Support", "Development", "Feierabend VIPs", "Im Feierabend :)"), start=1)}
+
+    guild_members = [FakeMember(1000, "bench_admin", roles=(roles["Owner"], roles["Im Feierabend :)"]))]
+    for member in range(members):
+        name = f"vip_user_{member}" if member % 10 else f"renamed_user_{member}"
+        member_roles = [roles["Im Feierabend :)"]]
+        if rng.random() < 0.25:
+            member_roles.append(roles["Feierabend VIPs"])
+        guild_members.append(FakeMember(2000 + member, name, discriminator=fake_discriminator(member),
+                                        global_name=f"Player {member}", roles=member_roles))
+
+    bot_user = FakeMember(1, "FeierabendBot")
+    return FakeGuild(index.feierabend_id, "Feierabend", guild_members, roles.values(), bot_user)
+
+
+# Function to create Tip4Server purchase messages for the VIP channel
+def fake_purchase_messages(guild, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    time_now = datetime.now()
+    messages = []
+    for message in range(count):
+        member = rng.choice(guild.members)
+        time_end = time_now + timedelta(days=rng.randint(-30, 60))
+        messages.append(FakeMessage(utils.time_snowflake(time_now - timedelta(minutes=count - message)),
+                                    f"VIP+ purchased by {member.name} Steam 7656119{rng.randint(10**9, 10**10)} valid until {time_end:%Y-%m-%d %H:%M:%S}"))
+    return messages
+
+#########################################################################################
+# Upstream Stand-Ins
+#########################################################################################
+
+class UpstreamStandIn:
+    """Local aiohttp server which emulates zenquotes, Reddit, the image CDN and Dropbox
+
+    latency and failure_rate map an upstream ("zenquotes", "reddit", "cdn", "dropbox") to seconds and a rate between
+    0 and 1, failed requests are answered with 429 by zenquotes and 503 by all others."""
+
+    upstreams = ("zenquotes", "reddit", "cdn", "dropbox")
+
+    def __init__(self, latency = None, failure_rate = None, roster: bytes = b"", asset_size: int = 256 * 1024, seed: int = 0):
+        self.latency = dict(latency or {})
+        self.failure_rate = dict(failure_rate or {})
+        self.rng = random.Random(seed)
+        self.requests = Counter()
+        self.failures = Counter()
+        self.asset = b"\x89PNG\r\n\x1a\n" + bytes(asset_size)
+        self.asset_etag = f'"{hashlib.sha256(self.asset).hexdigest()[:16]}"'
+        self.roster_update(roster)
+        self.runner = None
+        self.url = None
+
+    # Function to replace the VIP Excel Sheet, the revision changes like it does on Dropbox
+    def roster_update(self, roster: bytes):
+        self.roster = roster
+        self.roster_hash = hashlib.sha256(roster).hexdigest()
+        self.roster_rev = f"{self.rng.getrandbits(48):012x}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        app = web.Application(middlewares=[self._upstream_middleware])
+        app.router.add_get("/zenquotes/api/{endpoint}", self._zenquotes)
+        app.router.add_get("/cdn/star_wars.png", self._cdn_asset)
+        app.router.add_get("/cdn/media/{name}", self._cdn_media)
+        app.router.add_post("/dropbox/2/files/get_metadata", self._dropbox_metadata)
+        app.router.add_post("/dropbox/2/files/download", self._dropbox_download)
+        # Reddit has no path prefix, asyncprawcore joins its API paths with the OAuth URL
+        app.router.add_post("/api/v1/access_token", self._reddit_token)
+        app.router.add_post("/api/search_reddit_names{slash:/?}", self._reddit_search)
+        app.router.add_get("/r/{subreddit}/hot{slash:/?}", self._reddit_hot)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        self.url = f"http://{host}:{self.runner.addresses[0][1]}"
+        return self
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    @web.middleware
+    async def _upstream_middleware(self, request, handler):
+        prefix = request.path.split("/")[1]
+        upstream = prefix if prefix in self.upstreams else "reddit"
+        self.requests[upstream] += 1
+
+        latency = self.latency.get(upstream, 0)
+        if latency > 0:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * latency)
+        if self.rng.random() < self.failure_rate.get(upstream, 0):
+            self.failures[upstream] += 1
+            if upstream == "zenquotes":
+                return web.Response(status=429, headers={"Retry-After": "1"})
+            return web.Response(status=503)
+        return await handler(request)
+
+    # zenquotes
+    async def _zenquotes(self, request):
+        endpoint = request.match_info["endpoint"]
+        count = 50 if endpoint == "quotes" else 1
+        return web.json_response([{"q": f"Benchmark quote {self.rng.randint(0, 10**6)}", "a": "Stand-In", "h": ""}
+                                  for _ in range(count)])
+
+    # Image CDN
+    async def _cdn_asset(self, request):
+        if request.headers.get("If-None-Match") == self.asset_etag:
+            return web.Response(status=304)
+        return web.Response(body=self.asset, content_type="image/png", headers={"ETag": self.asset_etag})
+
+    async def _cdn_media(self, request):
+        name = request.match_info["name"]
+        content_type = "text/html" if name.endswith("-page") else "image/png"
+        return web.Response(body=self.asset[:1024], content_type=content_type)
+
+    # Dropbox
+    async def _dropbox_metadata(self, request):
+        return web.json_response({"rev": self.roster_rev, "content_hash": self.roster_hash})
+
+    async def _dropbox_download(self, request):
+        result = json.dumps({"rev": self.roster_rev, "content_hash": self.roster_hash, "size": len(self.roster)})
+        return web.Response(body=self.roster, content_type="application/octet-stream", headers={"Dropbox-API-Result": result})
+
+    # Reddit, the Submission IDs decide if the URL has an extension, is an image without extension or a web page
+    def _reddit_submission(self, subreddit: str, submission_id: str):
+        kind = int(submission_id, 36) % 10
+        media_name = f"{submission_id}.png" if kind < 7 else submission_id if kind < 9 else f"{submission_id}-page"
+        return {"kind": "t3", "data": {
+            "id": submission_id,
+            "name": f"t3_{submission_id}",
+            "title": f"Benchmark submission {submission_id}",
+            "url": f"{self.url}/cdn/media/{media_name}",
+            "permalink": f"/r/{subreddit}/comments/{submission_id}/benchmark/",
+            "subreddit": subreddit,
+            "author": "benchmark_author",
+            "created_utc": 1700000000,
+            "over_18": False,
+        }}
+
+    @staticmethod
+    def _reddit_listing(children):
+        return {"kind": "Listing", "data": {"after": None, "before": None, "dist": len(children), "modhash": None, "children": children}}
+
+    def _reddit_submission_id(self):
+        return format(self.rng.randint(16**5, 16**6 - 1), "x")
+
+    async def _reddit_token(self, request):
+        return web.json_response({"access_token": "benchmark", "token_type": "bearer", "expires_in": 86400, "scope": "*"})
+
+    async def _reddit_search(self, request):
+        query = (await request.post()).get("query", "")
+        if query.lower().startswith("missing"):
+            return web.json_response({"message": "Not Found", "error": 404}, status=404)
+        return web.json_response({"names": [query]})
+
+    async def _reddit_hot(self, request):
+        subreddit = request.match_info["subreddit"]
+        limit = min(int(request.query.get("limit", 100)), 100)
+        return web.json_response(self._reddit_listing([self._reddit_submission(subreddit, self._reddit_submission_id())
+                                                       for _ in range(limit)]))
+
+
+class DropboxStandIn:
+    """Replaces the Dropbox SDK instance, the blocking calls go to the Dropbox stand-in like the SDK does"""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def _request(self, endpoint: str, arguments: dict):
+        request = urllib.request.Request(f"{self.url}/dropbox/2/files/{endpoint}", method="POST",
+                                         headers={"Dropbox-API-Arg": json.dumps(arguments)})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.headers, response.read()
+
+    def files_get_metadata(self, path: str):
+        _, content = self._request("get_metadata", {"path": path})
+        return SimpleNamespace(**json.loads(content))
+
+    def files_download(self, path: str, rev: str = None):
+        headers, content = self._request("download", {"path": path, "rev": rev})
+        return SimpleNamespace(**json.loads(headers["Dropbox-API-Result"])), SimpleNamespace(content=content)
+
+
+# Function to point the bot to the fake Guild and the stand-ins, the HTTP Session has to be created inside the event loop
+def install(guild, standin = None):
+    index.client._connection.user = guild.me
+    index.client.get_guild = lambda guild_id: guild if guild_id == guild.id else None
+    index.client.get_channel = guild.get_channel
+    index.vip_purchase_index_path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "vip_purchases.json")
+    index.config_data["dropbox_filepath"] = "/vip_roster.xlsx"
+
+    if standin is not None:
+        index.zenquotes_url = f"{standin.url}/zenquotes/api"
+        index.starwars_static_url = f"{standin.url}/cdn/star_wars.png"
+        index.reddit_urls = {"oauth_url": standin.url, "reddit_url": standin.url}
+        index.reddit_api_enabled = True
+        index.reddit_client = None
+        index.dropbox_client = DropboxStandIn(standin.url)
+
+#########################################################################################
+# Measurement
+#########################################################################################
+
+# Function to receive a percentile of a list of timings
+def percentile(timings, fraction: float):
+    if not timings:
+        return 0.0
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StallMonitor:
+    """Measures how late the event loop wakes up a sleeping task, a late wake up means something blocked the loop"""
+
+    def __init__(self, interval: float = 0.01, threshold: float = 0.05):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            time_start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - time_start - self.interval
+            if lag >= self.threshold:
+                self.stalls.append(lag)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    # Function to receive the stalls since the last call
+    def take(self):
+        stalls, self.stalls = self.stalls, []
+        return stalls
@@ -1,23 +1,187 @@
 #!/usr/bin/env python3.11
 # Imports
+import time
+startup_time = time.perf_counter()
 import os
 import sys
+import signal
 import re
-import requests
+import ssl
+import asyncio
 import mimetypes
 import json
+import sqlite3
+import pickle
+import threading
+import functools
+import atexit
+import logging
+import logging.handlers
+import queue
+import contextlib
+import hashlib
+import importlib
 import io
+import uuid
 import aiohttp
-import asyncpraw
-import asyncprawcore
+from aiohttp import web
 import aiofiles
-import dropbox
-import pandas
 import random
 import traceback
-import timeit
-from datetime import datetime, timedelta, timezone
-from discord import app_commands, Intents, Client, Interaction, File, Object, Embed, Status, Game, utils
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from datetime import date, datetime, timezone
+from discord import app_commands, AutoShardedClient, Intents, MemberCacheFlags, Interaction, File, Object, Embed, Status, Game, HTTPException, LoginFailure, utils
+
+# Heavy modules are imported in the functions which use them and warmed up in the background after the bot is ready
+heavy_modules = ("asyncprawcore", "asyncpraw", "dropbox", "numpy", "openpyxl")
+
+#########################################################################################
+# Logging
+#########################################################################################
+
+# Logging Settings, records are formatted and written by a background thread
+log_path = "bot.log"
+log_max_bytes = 5 * 1024 * 1024
+log_backup_count = 5
+log_queue_size = 10000
+log_traceback_interval = 60
+
+# Share of successful commands which are logged (Command -> 0.0 to 1.0), failed commands are always logged
+log_command_sample_rates = {}
+
+# Structured fields of command records
+log_fields = ("command", "guild", "user_id", "duration", "outcome", "args")
+
+log = logging.getLogger("bot")
+log_stats = {"dropped": 0}
+
+# Queue Handler which hands records to the background thread without formatting them
+class LogQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        # Drop records instead of blocking when the writer can not keep up
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_stats["dropped"] += 1
+
+
+# Filter which only logs a share of the successful command records
+class LogSampleFilter(logging.Filter):
+    def filter(self, record):
+        command = getattr(record, "command", None)
+        if command is None or getattr(record, "outcome", "success") != "success":
+            return True
+        return random.random() < log_command_sample_rates.get(command, 1.0)
+
+
+# Filter which logs the full traceback of the same exception location only once per interval
+class LogTracebackFilter(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.last_logged = {}
+        self.suppressed = {}
+
+    def filter(self, record):
+        if not record.exc_info or record.exc_info[1] is None:
+            return True
+
+        exception = record.exc_info[1]
+        frames = traceback.extract_tb(record.exc_info[2])
+        location = (type(exception).__name__, frames[-1].filename, frames[-1].lineno) if frames else (type(exception).__name__,)
+
+        time_now = time.monotonic()
+        if time_now - self.last_logged.get(location, -log_traceback_interval) < log_traceback_interval:
+            # Only log the exception message
+            self.suppressed[location] = self.suppressed.get(location, 0) + 1
+            record.msg = f"{record.getMessage()}: {type(exception).__name__}: {exception} (traceback suppressed)"
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+        else:
+            suppressed = self.suppressed.pop(location, 0)
+            if suppressed:
+                record.msg = f"{record.getMessage()} ({suppressed} similar tracebacks suppressed)"
+                record.args = None
+            self.last_logged[location] = time_now
+        return True
+
+
+# Formatter which writes one JSON object per record into the log file
+class LogJsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in log_fields:
+            if getattr(record, field, None) is not None:
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# Function to route all log records through a queue to the console and a rotating log file
+def _logging_setup():
+    log_queue = queue.Queue(maxsize=log_queue_size)
+
+    queue_handler = LogQueueHandler(log_queue)
+    queue_handler.addFilter(LogSampleFilter())
+    queue_handler.addFilter(LogTracebackFilter())
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    # Every worker of the sharded mode writes its own file, a rotating file can not be shared between processes
+    file_handler = logging.handlers.RotatingFileHandler(_worker_path(log_path), maxBytes=log_max_bytes, backupCount=log_backup_count, encoding="utf-8")
+    file_handler.setFormatter(LogJsonFormatter())
+
+    log_listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(queue_handler)
+
+#########################################################################################
+# Startup Timing
+#########################################################################################
+
+# Duration of every startup phase (Phase -> Seconds)
+startup_timings = {}
+startup_last_mark = startup_time
+
+# Function to remember how long a startup phase took
+def _startup_mark(phase: str):
+    global startup_last_mark
+    time_now = time.perf_counter()
+    startup_timings[phase] = time_now - startup_last_mark
+    startup_last_mark = time_now
+
+
+# Function to print the startup timing report
+def _startup_report():
+    log.info("\n".join(["Startup timing:"] +
+                    [f"   {phase:<16} {seconds:7.3f} sec" for phase, seconds in startup_timings.items()] +
+                    [f"   {'total':<16} {sum(startup_timings.values()):7.3f} sec"]))
+
+
+# Function to import the heavy modules in the background, so the first command using them does not wait
+async def _heavy_modules_warm():
+    for module in heavy_modules:
+        time_start = time.perf_counter()
+        await _run_blocking(importlib.import_module, module)
+        startup_timings[f"warm {module}"] = time.perf_counter() - time_start
+    _startup_report()
+
+_startup_mark("imports")
 
 #########################################################################################
 # Requirements for Discord Bot
@@ -28,36 +192,460 @@ with open("config.json", 'r') as jsonfile:
     config_data = json.load(jsonfile)
     token = config_data.get("discord_token")
 
-# Check if Token is valid
-r = requests.get("https://discord.com/api/v10/users/@me", headers={
-    "Authorization": f"Bot {token}"
-})
+_startup_mark("config")
 
-# If the token is correct, it will continue the code
-data = r.json()
+# Guild IDs
+feierabend_id = 1047547059433119774
 
-if not data.get("id", None):
-    print("\n".join(["ERROR: Token is not valid!"]))
-    sys.exit(False)
+# Tip4Server Purchase Index Settings
+vip_purchase_channel_id = 1196074086980407367
+vip_purchase_index_path = "vip_purchases.json"
+vip_packet_pattern = re.compile(r"^([^\s]+)")
+vip_datetime_pattern = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+vip_name_pattern = re.compile(r"[\w.]+")
+
+# Tip4Server Purchase Index (Message ID -> Purchase, Name -> Message IDs)
+# last_message_id is only advanced by the backfill, live messages can arrive before it has read the messages sent while offline
+vip_purchases = {
+    "last_message_id": None,
+    "messages": {},
+    "by_name": {},
+    "backfilled": False,
+}
+vip_purchases_lock = asyncio.Lock()
+
+# Shared HTTP Session Settings
+http_connection_limit = 100
+http_connection_limit_per_host = 10
+http_keepalive_timeout = 60
+http_dns_cache_ttl = 300
+
+# Timeouts per Upstream Service
+http_timeouts = {
+    "discord_cdn": aiohttp.ClientTimeout(total=15, connect=5),
+    "reddit": aiohttp.ClientTimeout(total=20, connect=5),
+    "zenquotes": aiohttp.ClientTimeout(total=10, connect=5),
+    "media_probe": aiohttp.ClientTimeout(total=5, connect=3),
+}
+
+# Media Cache Settings, size in bytes and times in seconds
+media_cache_max_bytes = 8 * 1024 * 1024
+media_cache_revalidate_after = 3600
+media_attachment_ttl = 43200
+
+# Static Assets
+starwars_static_url = "https://media.discordapp.net/attachments/732222852606066788/1052919738034045008/fc5ed98c2b4952971ec03a495fc85d73.png"
+
+# Cached static Assets (URL -> Data and Validators) and uploaded Attachments (URL -> (Attachment URL, Expire Time))
+media_cache = OrderedDict()
+media_cache_stats = {"bytes": 0}
+media_attachments = {}
+
+# Media Probe Settings
+media_extensions = (".jpg", ".png", ".gif", ".gifv")
+media_probe_cache_size = 2048
+media_probe_retries = 2
+media_probe_ssl = ssl.create_default_context(cafile=os.path.dirname(os.path.abspath(__file__))+"/certs.pem")
+
+# Reddit Settings
+# Thousands of subreddits go dark protesting Reddit's new API Costs
+reddit_api_enabled = False
+
+# Reddit Endpoints (oauth_url, reddit_url) which replace the asyncpraw defaults, e.g. local stand-ins of the benchmarks
+reddit_urls = {}
+
+# Random Submissions requested from Reddit before a Subreddit counts as without media
+reddit_media_attempts = 10
+
+# Reddit Subreddit Cache Settings (in seconds), Subreddits which do not exist are cached shorter
+reddit_subreddit_cache_ttl = 21600
+reddit_subreddit_negative_ttl = 600
+
+# Reddit Instance and resolved Subreddits (Name -> (Expire Time, Subreddit or None))
+reddit_client = None
+reddit_subreddit_cache = {}
+
+# Reddit Hot Listing Cache Settings (in seconds), the Commands pick a random Submission of it when their prefetch pool is empty
+reddit_hot_cache_ttl = 300
+reddit_hot_cache_size = 64
+
+# Hot listings of Subreddits (Name -> (Expire Time, Submissions))
+reddit_hot_cache = OrderedDict()
+
+# Reddit Prefetch Settings, Subreddits of the fixed Commands are never removed
+reddit_prefetch_subreddits = ("meme", "starwarsmemes", "gifs", "art", "dataisbeautiful")
+reddit_prefetch_pool_size = 25
+reddit_prefetch_low_water = 8
+reddit_prefetch_interval = 300
+reddit_prefetch_idle_timeout = 1800
+reddit_prefetch_served_size = 2000
+reddit_prefetch_dynamic_limit = 50
+
+# Prefetched Reddit Media (Subreddit -> Submissions ready to send)
+RedditMedia = namedtuple("RedditMedia", ["url", "title"])
+reddit_prefetch_pools = {name: deque() for name in reddit_prefetch_subreddits}
+reddit_prefetch_last_used = {}
+reddit_prefetch_served = OrderedDict()
+reddit_prefetch_wakeup = asyncio.Event()
+
+# Quote Settings (in seconds), zenquotes is paused this long after a rate limit without Retry-After header
+zenquotes_url = "https://zenquotes.io/api"
+quote_pool_low_water = 10
+quote_pool_interval = 600
+quote_backoff_default = 60
+
+# Cached Quote of the Day (UTC Date -> Quote) and Pool of random Quotes
+quote_of_the_day = {"date": None, "quote": None}
+quote_pool = deque()
+quote_pool_wakeup = asyncio.Event()
+quote_backoff_until = 0
+
+# Dropbox Settings (in seconds), the Access Token is refreshed this long before it expires
+dropbox_token_refresh_margin = 600
+dropbox_token_check_interval = 900
+
+# Dropbox Instance
+dropbox_client = None
+
+# Blocking Executor Settings, a limited number of threads for the Dropbox SDK and Excel parsing
+blocking_executor_workers = 4
+blocking_timeouts = {
+    "dropbox": 60,
+    "excel_parse": 60,
+    "snapshot": 60,
+}
+
+# Blocking Executor and its queue depth (running and waiting calls)
+blocking_executor = ThreadPoolExecutor(max_workers=blocking_executor_workers, thread_name_prefix="blocking")
+blocking_executor_stats = {"pending": 0, "peak": 0, "timeouts": 0}
+
+# In-flight upstream fetches (Resource Key -> Task and number of waiting callers)
+single_flight_tasks = {}
+
+# VIP Roster Settings (in seconds)
+vip_roster_interval = 300
+vip_roster_max_age = 60
+
+# VIP Role Update Settings, number of parallel role requests and seconds between progress updates
+role_update_workers = 4
+role_update_progress_interval = 3
+
+# Layout of the VIP Excel Sheet, the header is the fourth non empty row
+# Used Columns: Game Name, Discord Name, End Date, Steam ID
+vip_roster_header = 3
+vip_roster_columns = (1, 2, 4, 7)
+VipRow = namedtuple("VipRow", ["game_name", "discord_name", "end_date", "steam_id"])
+
+# Parsed VIP Excel Sheet with indexes by Discord Name and Steam ID, only reloaded if the Dropbox revision changes
+vip_roster = {
+    "rev": None,
+    "content_hash": None,
+    "checked": 0,
+    "rows": None,
+    "end_dates": None,
+    "by_discord": {},
+    "by_steam": {},
+    "by_member": {},
+}
+vip_roster_lock = asyncio.Lock()
+
+# Member Name Index of the Feierabend Guild (Name -> Member ID) and last known member of a roster Discord Name
+member_index = {
+    "name": {},
+    "tag": {},
+    "display": {},
+}
+vip_member_links = {}
+
+# Metrics Settings, the Prometheus endpoint only listens on the local machine
+metrics_host = "127.0.0.1"
+metrics_port = 9108
+metrics_prefix = "discord_bot"
+metrics_buckets = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+metrics_recent_samples = 1000
+
+# Metrics ((Metric, Labels) -> Histogram or Counter)
+metrics_histograms = {}
+metrics_counters = {}
+
+# Admission Settings, token buckets are (capacity, tokens per second) and every command takes the cost of its class
+admission_enabled = True
+admission_user_bucket = (12, 0.2)
+admission_guild_bucket = (120, 2)
+admission_cost_classes = {
+    "cheap": {"cost": 1, "bucket": (60, 10)},
+    "quotes": {"cost": 2, "bucket": (20, 1)},
+    "reddit": {"cost": 3, "bucket": (30, 1)},
+    "dropbox": {"cost": 4, "bucket": (10, 0.2)},
+}
+admission_command_classes = {
+    "reddit": "reddit", "meme": "reddit", "starwars": "reddit", "gif": "reddit", "art": "reddit", "dataisbeautiful": "reddit",
+    "qod": "quotes", "quote": "quotes",
+    "vipstatus": "dropbox", "expiredvips": "dropbox", "vipupdate": "dropbox",
+}
+
+# Admission Settings, commands of these classes run at most this many times at once, idle buckets are removed above the limit
+admission_expensive_classes = ("dropbox",)
+admission_expensive_limit = 3
+admission_bucket_limit = 10000
+
+# Token Buckets ((Kind, ID) -> [Tokens, Last Update]) and running expensive commands
+admission_buckets = {}
+admission_stats = {"expensive_running": 0}
+
+# Gateway Settings, the lean mode only receives and caches what the bot uses, start with "--full-gateway" to receive everything
+gateway_lean = "--full-gateway" not in sys.argv
+gateway_rate_window = 60
+
+# Received Gateway Events and their rate of the last window
+gateway_stats = {"events": 0, "window_start": time.monotonic(), "window_events": 0, "rate": 0.0}
+
+# Command Sync Settings, start with "--force-sync" to sync the commands even if they did not change
+command_sync_path = "command_sync.json"
+force_command_sync = "--force-sync" in sys.argv
+
+# Fingerprints of the last synced commands (Scope -> Fingerprint)
+command_sync_fingerprints = None
+
+# Function to read the value of a command line option like "--worker 1", returns default if it is not given
+def _command_line_value(option: str, default = None):
+    if option in sys.argv[1:-1]:
+        return sys.argv[sys.argv.index(option) + 1]
+    return default
+
+# Sharding Settings, launcher.py starts the workers with "--shard-count 8 --shard-ids 0,1,2,3 --worker 0"
+# Without them one process connects all shards Discord recommends
+shard_count = int(_command_line_value("--shard-count", 0)) or None
+shard_ids = [int(shard_id) for shard_id in _command_line_value("--shard-ids").split(",")] if _command_line_value("--shard-ids") else None
+worker_id = int(_command_line_value("--worker", 0))
+if shard_ids is not None and shard_count is None:
+    sys.exit("--shard-ids needs --shard-count")
+
+# The bot only runs as one of several workers if its shards are a part of all shards, otherwise it runs like one process
+worker_mode = shard_ids is not None and len(set(shard_ids)) < shard_count
+
+# The worker with the shard of the Feierabend Guild owns the VIP jobs, the command sync and the Dropbox Access Token
+vip_owner = shard_ids is None or (feierabend_id >> 22) % shard_count in shard_ids
+
+# Shared State Settings, the workers share the quote pool and the Reddit prefetch pools in this SQLite database
+# The statements run on the event loop, so a worker only waits shared_state_timeout seconds for the lock of another worker
+shared_state_path = "shared_state.sqlite"
+shared_state_timeout = 0.05
+
+# Shared State Database Connection, only opened when the bot runs as one of several workers
+shared_state = None
+
+# Snapshot Settings (in seconds), the derived caches are written periodically and loaded again on the next start
+snapshot_path = "snapshot.pickle"
+snapshot_interval = 600
+snapshot_version = 1
+
+# Pickled VIP roster of the last snapshot, it is only pickled again when the Dropbox revision changes
+snapshot_roster_cache = {"rev": None, "data": None}
+snapshot_write_lock = threading.Lock()
+
+
+# Function to receive the path of a file which every worker of the sharded mode writes itself, e.g. "bot.worker1.log"
+def _worker_path(path: str):
+    if not worker_mode:
+        return path
+    base, extension = os.path.splitext(path)
+    return f"{base}.worker{worker_id}{extension}"
+
+
+class SharedPool:
+    """Queue in the shared state database, it has the parts of the deque interface which are used for the pools
+
+    Every statement is short and local, so they run directly on the event loop like the in-memory deques. If another
+    worker holds the lock longer than shared_state_timeout, popleft handles the pool like an empty one and writes are
+    skipped, the pools are filled again by the background tasks."""
+
+    def __init__(self, name: str, decode = None):
+        self.name = name
+        self.decode = decode or (lambda item: item)
+
+    def __len__(self):
+        return shared_state.execute("SELECT COUNT(*) FROM pool WHERE name = ?", (self.name,)).fetchone()[0]
+
+    def __iter__(self):
+        rows = shared_state.execute("SELECT item FROM pool WHERE name = ? ORDER BY id", (self.name,)).fetchall()
+        return iter([self.decode(json.loads(item)) for item, in rows])
+
+    # Context Manager for a write transaction, other workers wait up to shared_state_timeout for it
+    @staticmethod
+    @contextlib.contextmanager
+    def _transaction():
+        shared_state.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            shared_state.execute("ROLLBACK")
+            raise
+        shared_state.execute("COMMIT")
 
+    def append(self, item):
+        self.extend((item,))
 
-# Welcome in console
-print("\n".join([
-    "Starting Discord Bot..."
-]))
+    def extend(self, items):
+        try:
+            with self._transaction():
+                shared_state.executemany("INSERT INTO pool (name, item) VALUES (?, ?)", [(self.name, json.dumps(item)) for item in items])
+        except sqlite3.OperationalError:
+            log.warning(f"Shared pool {self.name} is locked, skipped adding items")
+
+    def popleft(self):
+        """Removes and returns the oldest item, IndexError if the pool is empty, also if another worker took it first or holds the lock"""
+        try:
+            with self._transaction():
+                row = shared_state.execute("SELECT id, item FROM pool WHERE name = ? ORDER BY id LIMIT 1", (self.name,)).fetchone()
+                if row is not None:
+                    shared_state.execute("DELETE FROM pool WHERE id = ?", (row[0],))
+        except sqlite3.OperationalError:
+            log.warning(f"Shared pool {self.name} is locked, handled as empty")
+            row = None
+        if row is None:
+            raise IndexError("pop from an empty pool")
+        return self.decode(json.loads(row[1]))
+
+    def clear(self):
+        try:
+            with self._transaction():
+                shared_state.execute("DELETE FROM pool WHERE name = ?", (self.name,))
+        except sqlite3.OperationalError:
+            log.warning(f"Shared pool {self.name} is locked, skipped clearing it")
 
-# Guild IDs
-feierabend_id = 1047547059433119774
+
+# Function to open the shared state database and move the pools into it
+def _shared_state_open():
+    global shared_state, quote_pool
+    shared_state = sqlite3.connect(shared_state_path, timeout=shared_state_timeout, isolation_level=None)
+    shared_state.execute("PRAGMA journal_mode=WAL")
+    shared_state.execute("PRAGMA synchronous=NORMAL")
+    shared_state.execute("CREATE TABLE IF NOT EXISTS pool (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, item TEXT NOT NULL)")
+    shared_state.execute("CREATE INDEX IF NOT EXISTS pool_name ON pool (name, id)")
+
+    quote_pool = SharedPool("quotes")
+    for name in reddit_prefetch_pools:
+        reddit_prefetch_pools[name] = _reddit_prefetch_pool(name)
 
 # Main Class to response in Discord
-class ChatResponse(Client):
+class ChatResponse(AutoShardedClient):
     def __init__(self):
-        super().__init__(intents = Intents.all())
+        if gateway_lean:
+            # Slash commands, members and roles of the Feierabend Guild and the messages of the Tip4Server VIP channel
+            intents = Intents.none()
+            intents.guilds = True
+            intents.members = True
+            intents.guild_messages = True
+            intents.message_content = True
+
+            # Only joined members are cached, no messages and only the Feierabend Guild is chunked (see on_guild_available)
+            member_cache_flags = MemberCacheFlags.none()
+            member_cache_flags.joined = True
+            super().__init__(intents = intents, member_cache_flags = member_cache_flags,
+                             chunk_guilds_at_startup = False, max_messages = None,
+                             shard_count = shard_count, shard_ids = shard_ids)
+        else:
+            super().__init__(intents = Intents.all(), shard_count = shard_count, shard_ids = shard_ids)
         self.tree = app_commands.CommandTree(self)
+        self.http_session = None
+        self.reddit_prefetch_task = None
+        self.vip_roster_task = None
+        self.dropbox_token_task = None
+        self.quote_pool_task = None
+        self.snapshot_task = None
+        self.metrics_runner = None
 
     async def setup_hook(self) -> None:
         """ This is called when the bot boots, to setup the global commands """
-        await self.tree.sync(guild = None)
+        _startup_mark("login")
+
+        # Shut down like on Ctrl+C when the launcher or the system stops the bot, so the snapshot is saved and the log flushed
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+
+        # Workers of the sharded mode share the pools
+        if worker_mode:
+            _shared_state_open()
+            log.info(f"Worker {worker_id}: shards {shard_ids} of {shard_count}{', owns the VIP jobs' if vip_owner else ''}")
+
+        # Create one long-lived HTTP Session which is used by all Commands
+        self.http_session = _http_session_create()
+
+        # Start the local metrics endpoint
+        try:
+            self.metrics_runner = await _metrics_server_start()
+        except OSError:
+            log.exception(f"Exception occured starting metrics endpoint")
+
+        # Load the Tip4Server purchase index from disk
+        if vip_owner:
+            await _vip_purchases_load()
+
+        # Start warm with the caches of the last run, they are revalidated in the background
+        await _snapshot_load()
+        asyncio.create_task(_media_cache_revalidate())
+        self.snapshot_task = asyncio.create_task(_snapshot_loop())
+
+        # Start filling the Reddit prefetch pools in the background
+        if reddit_api_enabled:
+            self.reddit_prefetch_task = asyncio.create_task(_reddit_prefetch_loop())
+
+        # Keep the quote pool filled in the background
+        self.quote_pool_task = asyncio.create_task(_quote_pool_loop())
+
+        # Keep the Dropbox Access Token valid and the VIP roster up to date in the background
+        if vip_owner:
+            self.dropbox_token_task = asyncio.create_task(_dropbox_token_loop())
+            self.vip_roster_task = asyncio.create_task(_vip_roster_loop())
+            await self.sync_commands(guild = None)
+        _startup_mark("setup_hook")
+
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        """ This is called for every event, gateway events are counted here without starting a listener task """
+        if event_name == "socket_event_type":
+            _gateway_event_count()
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def sync_commands(self, guild = None) -> None:
+        """ Syncs the commands of a scope (global or guild) only if they have changed since the last sync """
+        scope = "global" if guild is None else str(guild.id)
+
+        # Fingerprint of the command payload which would be sent to Discord
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild = guild)]
+        fingerprint = hashlib.sha256(json.dumps([self.application_id, payload], sort_keys=True).encode()).hexdigest()
+
+        # Read the fingerprints of the last syncs
+        if command_sync_fingerprints is None:
+            await _command_sync_load()
+        if not force_command_sync and command_sync_fingerprints.get(scope) == fingerprint:
+            log.info(f"Commands of scope {scope} are unchanged, skipping sync")
+            return
+
+        await self.tree.sync(guild = guild)
+        command_sync_fingerprints[scope] = fingerprint
+        await _json_save(command_sync_path, command_sync_fingerprints)
+        log.info(f"Synced commands of scope {scope}")
+
+    async def close(self) -> None:
+        """ This is called when the bot shuts down, to close the shared HTTP Session """
+        for task in (self.reddit_prefetch_task, self.vip_roster_task, self.dropbox_token_task, self.quote_pool_task, self.snapshot_task):
+            if task is not None:
+                task.cancel()
+
+        # Save the caches for the next start, only if they were loaded, a failed login must not replace the last snapshot
+        if self.snapshot_task is not None:
+            try:
+                await _snapshot_save()
+            except Exception:
+                log.exception(f"Exception occured saving snapshot")
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        blocking_executor.shutdown(wait=False, cancel_futures=True)
+        if shared_state is not None:
+            shared_state.close()
+        await super().close()
 
 # Variable to store the bot class and interact with it
 # Since this is a simple bot to run 1 command over slash commands
@@ -74,27 +662,337 @@ async def on_ready():
         It also prints out the bot's invite URL that automatically uses your
         Client ID to make sure you invite the correct bot with correct scopes.
     """
-    print("\n".join([
+    log.info("\n".join([
         f"Logged in as {client.user} (ID: {client.user.id})",
         "",
         f"Use this URL to invite {client.user} to your server:",
         f"https://discord.com/api/oauth2/authorize?client_id={client.user.id}&scope=applications.commands%20bot"
     ]))
 
-    await client.tree.sync(guild = Object(id = feierabend_id))
+    if vip_owner:
+        await client.sync_commands(guild = Object(id = feierabend_id))
     await client.change_presence(status=Status.online, activity=Game(name="/help | aerography.eu"))
 
+    # Report the startup timing once and import the heavy modules in the background
+    if "ready" not in startup_timings:
+        _startup_mark("ready")
+        _startup_report()
+        log.info(f"Gateway mode: {'lean' if gateway_lean else 'full'}, {len(client.guilds)} guilds, RSS {_process_rss() / 1048576:.0f} MB")
+        asyncio.create_task(_heavy_modules_warm())
+
+    # Index Tip4Server purchases which were sent while the bot was offline
+    if vip_owner:
+        asyncio.create_task(_vip_purchases_backfill())
+
+
+@client.event
+async def on_guild_available(guild):
+    """ This is called when a guild becomes available, the member name index of the Feierabend Guild is built """
+    if guild.id == feierabend_id:
+        # In the lean gateway mode only this Guild requests all of its members
+        if not guild.chunked:
+            await guild.chunk()
+        _member_index_build(guild)
+
+
+@client.event
+async def on_member_join(member):
+    """ This is called when a member joins a guild """
+    if member.guild.id == feierabend_id:
+        _member_index_add(member)
+        _vip_roster_link_member(member)
+
+
+@client.event
+async def on_member_remove(member):
+    """ This is called when a member leaves a guild """
+    if member.guild.id == feierabend_id:
+        _member_index_remove(member)
+
+
+@client.event
+async def on_member_update(before, after):
+    """ This is called when a member changes the nickname, roles, etc. """
+    if after.guild.id == feierabend_id:
+        _member_index_remove(before)
+        _member_index_add(after)
+        _vip_roster_link_member(after)
+
+
+@client.event
+async def on_user_update(before, after):
+    """ This is called when a user changes the username or global name """
+    guild = client.get_guild(feierabend_id)
+    member = guild.get_member(after.id) if guild is not None else None
+    if member is not None:
+        _member_index_remove(before)
+        _member_index_add(member)
+        _vip_roster_link_member(member)
+
+
+@client.event
+async def on_message(message):
+    """ This is called for every new message, purchases in the Tip4Server VIP channel are indexed """
+    if message.channel.id == vip_purchase_channel_id and _vip_purchase_index(message.id, message.content):
+        await _vip_purchases_save()
+
+
+@client.event
+async def on_raw_message_edit(payload):
+    """ This is called for every edited message, also if it is not cached, purchases in the Tip4Server VIP channel are indexed again """
+    if payload.channel_id == vip_purchase_channel_id and "content" in payload.data:
+        _vip_purchase_index(payload.message_id, payload.data["content"])
+        await _vip_purchases_save()
+
 #########################################################################################
 # Functions
 #########################################################################################
 
+# Function to find or create a metric entry, labels are stored as sorted tuple
+def _metrics_key(metric: str, labels: dict):
+    return (metric, tuple(sorted(labels.items())))
+
+
+# Function to add a duration (in seconds) to a histogram
+def _metrics_observe(metric: str, seconds: float, **labels):
+    key = _metrics_key(metric, labels)
+    histogram = metrics_histograms.get(key)
+    if histogram is None:
+        histogram = {"buckets": [0] * len(metrics_buckets), "sum": 0.0, "count": 0, "recent": deque(maxlen=metrics_recent_samples)}
+        metrics_histograms[key] = histogram
+    for index, bucket in enumerate(metrics_buckets):
+        if seconds <= bucket:
+            histogram["buckets"][index] += 1
+    histogram["sum"] += seconds
+    histogram["count"] += 1
+    histogram["recent"].append(seconds)
+
+
+# Function to increase a counter
+def _metrics_count(metric: str, **labels):
+    key = _metrics_key(metric, labels)
+    metrics_counters[key] = metrics_counters.get(key, 0) + 1
+
+
+# Function to calculate a percentile of the recent samples of a histogram
+def _metrics_percentile(histogram, percentile: float):
+    samples = sorted(histogram["recent"])
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * percentile))]
+
+
+# Context Manager to measure an upstream call (Reddit, zenquotes, Dropbox, Excel parse, Discord REST)
+@contextlib.contextmanager
+def _upstream_timer(upstream: str):
+    time_start = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _metrics_observe("upstream_seconds", time.perf_counter() - time_start, upstream=upstream)
+        _metrics_count("upstream_requests_total", upstream=upstream, outcome=outcome)
+
+
+# Function to receive the (capacity, tokens per second) of a token bucket
+def _admission_bucket_settings(key: tuple):
+    if key[0] == "user":
+        return admission_user_bucket
+    if key[0] == "guild":
+        return admission_guild_bucket
+    return admission_cost_classes[key[1]]["bucket"]
+
+
+# Function to refill a token bucket, a new bucket starts full
+def _admission_bucket(key: tuple, time_now: float):
+    capacity, rate = _admission_bucket_settings(key)
+    bucket = admission_buckets.get(key)
+    if bucket is None:
+        bucket = admission_buckets[key] = [capacity, time_now]
+    bucket[0] = min(capacity, bucket[0] + (time_now - bucket[1]) * rate)
+    bucket[1] = time_now
+    return bucket
+
+
+# Function to decide if a command may run, returns None if it is admitted or the message for the user otherwise
+def _command_admit(interaction: Interaction, command_name: str):
+    """Takes tokens of the user, guild and cost class buckets, either from all of them or from none"""
+    if not admission_enabled:
+        return None
+    time_now = time.monotonic()
+    cost_class = admission_command_classes.get(command_name, "cheap")
+    cost = admission_cost_classes[cost_class]["cost"]
+
+    # Remove idle buckets, a full bucket behaves like a new one
+    if len(admission_buckets) > admission_bucket_limit:
+        for key, (tokens, updated) in list(admission_buckets.items()):
+            capacity, rate = _admission_bucket_settings(key)
+            if tokens + (time_now - updated) * rate >= capacity:
+                del admission_buckets[key]
+
+    # Tokens to take of every bucket, the cost class bucket counts commands
+    takes = {("user", interaction.user.id): cost, ("class", cost_class): 1}
+    if interaction.guild_id is not None:
+        takes[("guild", interaction.guild_id)] = cost
+
+    retry_after = 0
+    for key, tokens in takes.items():
+        bucket = _admission_bucket(key, time_now)
+        if bucket[0] < tokens:
+            retry_after = max(retry_after, (tokens - bucket[0]) / _admission_bucket_settings(key)[1])
+    if retry_after > 0:
+        return f"You are using commands too fast, please try again in {int(retry_after) + 1} {'second' if int(retry_after) == 0 else 'seconds'}."
+    if cost_class in admission_expensive_classes and admission_stats["expensive_running"] >= admission_expensive_limit:
+        return f"I am busy with other VIP requests right now, please try again in a moment."
+
+    for key, tokens in takes.items():
+        admission_buckets[key][0] -= tokens
+    return None
+
+
+# Decorator for the command handlers to admit the command, measure the latency and count the outcome of every command
+def _timed_command(function):
+    @functools.wraps(function)
+    async def _timed_command_wrapper(interaction: Interaction, *args, **kwargs):
+        time_start = time.perf_counter()
+        interaction.extras["outcome"] = "success"
+        expensive = False
+        try:
+            # Reject the command before it is deferred, so no work is started which would be dropped
+            rejection = _command_admit(interaction, function.__name__)
+            if rejection is not None:
+                interaction.extras["outcome"] = "rejected"
+                return await interaction.response.send_message(rejection, ephemeral=True)
+
+            if admission_command_classes.get(function.__name__, "cheap") in admission_expensive_classes:
+                expensive = True
+                admission_stats["expensive_running"] += 1
+            return await function(interaction, *args, **kwargs)
+        except Exception:
+            interaction.extras["outcome"] = "error"
+            raise
+        finally:
+            if expensive:
+                admission_stats["expensive_running"] -= 1
+            duration = time.perf_counter() - time_start
+            _metrics_observe("command_seconds", duration, command=function.__name__)
+            _metrics_count("commands_total", command=function.__name__, outcome=interaction.extras["outcome"])
+            log.info(f"{interaction.guild} : {interaction.user} used the {function.__name__} command.",
+                     extra={"command": function.__name__, "guild": interaction.guild_id, "user_id": interaction.user.id,
+                            "duration": round(duration, 4), "outcome": interaction.extras["outcome"], "args": kwargs or None})
+    return _timed_command_wrapper
+
+
+# Function to defer an interaction and measure how long it took since the user sent the command
+async def _defer(interaction: Interaction):
+    await interaction.response.defer()
+    _metrics_observe("defer_seconds", (utils.utcnow() - interaction.created_at).total_seconds(),
+                     command=interaction.command.name if interaction.command else "unknown")
+
+
+# Function to count a received gateway event and update the event rate once per window
+def _gateway_event_count():
+    gateway_stats["events"] += 1
+    gateway_stats["window_events"] += 1
+    time_now = time.monotonic()
+    if time_now - gateway_stats["window_start"] >= gateway_rate_window:
+        gateway_stats["rate"] = gateway_stats["window_events"] / (time_now - gateway_stats["window_start"])
+        gateway_stats["window_start"] = time_now
+        gateway_stats["window_events"] = 0
+
+
+# Function to receive the resident memory of the bot in bytes, only available on Linux
+def _process_rss():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+# Function to receive the gauges which are not measured by the commands itself
+def _metrics_gauges():
+    return {
+        "blocking_executor_pending": blocking_executor_stats["pending"],
+        "blocking_executor_peak": blocking_executor_stats["peak"],
+        "blocking_executor_timeouts": blocking_executor_stats["timeouts"],
+        "admission_expensive_running": admission_stats["expensive_running"],
+        "admission_buckets": len(admission_buckets),
+        "media_cache_bytes": media_cache_stats["bytes"],
+        "log_records_dropped": log_stats["dropped"],
+        "quote_pool_size": len(quote_pool),
+        "reddit_prefetch_pool_size": sum(len(pool) for pool in reddit_prefetch_pools.values()),
+        "gateway_latency_seconds": client.latency if client.latency == client.latency else 0.0,
+        "gateway_events": gateway_stats["events"],
+        "gateway_events_per_second": gateway_stats["rate"],
+        "process_rss_bytes": _process_rss(),
+    }
+
+
+# Function to create the Prometheus text format of all metrics
+def _metrics_render():
+    lines = []
+
+    # Function to format labels like {command="qod",outcome="success"}
+    def _labels(labels, extra = ()):
+        label_list = [f'{name}="{value}"' for name, value in tuple(labels) + tuple(extra)]
+        return "{" + ",".join(label_list) + "}" if label_list else ""
+
+    for metric in sorted({metric for metric, _ in metrics_histograms}):
+        lines.append(f"# TYPE {metrics_prefix}_{metric} histogram")
+        for (name, labels), histogram in metrics_histograms.items():
+            if name != metric:
+                continue
+            for bucket, count in zip(metrics_buckets, histogram["buckets"]):
+                lines.append(f"{metrics_prefix}_{metric}_bucket{_labels(labels, (('le', bucket),))} {count}")
+            lines.append(f"{metrics_prefix}_{metric}_bucket{_labels(labels, (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{metrics_prefix}_{metric}_sum{_labels(labels)} {histogram['sum']}")
+            lines.append(f"{metrics_prefix}_{metric}_count{_labels(labels)} {histogram['count']}")
+
+    for metric in sorted({metric for metric, _ in metrics_counters}):
+        lines.append(f"# TYPE {metrics_prefix}_{metric} counter")
+        for (name, labels), value in metrics_counters.items():
+            if name == metric:
+                lines.append(f"{metrics_prefix}_{metric}{_labels(labels)} {value}")
+
+    for metric, value in _metrics_gauges().items():
+        lines.append(f"# TYPE {metrics_prefix}_{metric} gauge")
+        lines.append(f"{metrics_prefix}_{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Handler of the local metrics endpoint
+async def _metrics_handler(request):
+    return web.Response(text=_metrics_render(), content_type="text/plain", charset="utf-8")
+
+
+# Function to start the local metrics endpoint for Prometheus
+async def _metrics_server_start():
+    metrics_app = web.Application()
+    metrics_app.router.add_get("/metrics", _metrics_handler)
+    metrics_runner = web.AppRunner(metrics_app, access_log=None)
+    await metrics_runner.setup()
+    await web.TCPSite(metrics_runner, metrics_host, metrics_port + worker_id).start()
+    log.info(f"Metrics available at http://{metrics_host}:{metrics_port + worker_id}/metrics")
+    return metrics_runner
+
+
+# Function to create the long-lived HTTP Session which is shared by all Commands
+def _http_session_create():
+    connector = aiohttp.TCPConnector(limit = http_connection_limit,
+                                     limit_per_host = http_connection_limit_per_host,
+                                     keepalive_timeout = http_keepalive_timeout,
+                                     ttl_dns_cache = http_dns_cache_ttl)
+    return aiohttp.ClientSession(connector = connector)
+
+
 # Function to check out all available commands
 async def _init_command_help_response(interaction):
     """The function to check help"""
     try:
-        # Respond in the console that the command has been ran
-        print(f"> {interaction.guild} : {interaction.user} used the help command.")
-
         await interaction.response.send_message("\n".join([
             f"Available Commands for {client.user.mention}:",
             "**\\help** - Shows this Message.",
@@ -112,7 +1010,8 @@ async def _init_command_help_response(interaction):
             "**And many other Discord Server specific Commands!**"
         ]))
     except Exception:
-        print(f" > Exception occured processing help command: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing help command")
         return await interaction.response.send_message(f"Can not process help command. Please contact <@164129430766092289> when this happened.")
 
 
@@ -126,9 +1025,6 @@ def console_create(traceback):
 async def _init_command_hello_response(interaction: Interaction):
    """A hello response from the Bot"""
 
-   # Respond in the console that the command has been ran
-   print(f"> {interaction.guild} : {interaction.user} used the hello command.")
-
    # Respond with a simple hello
    await interaction.response.send_message("\n".join([
       f"Hi {interaction.user.mention}, thank you for saying hello!",
@@ -137,108 +1033,398 @@ async def _init_command_hello_response(interaction: Interaction):
    ]))
 
 
+# Function to store a static asset in the media cache, least recently used assets are removed when the cache is full
+def _media_cache_store(url: str, data: bytes, etag, last_modified):
+    old_entry = media_cache.pop(url, None)
+    if old_entry is not None:
+        media_cache_stats["bytes"] -= len(old_entry["data"])
+    if len(data) > media_cache_max_bytes:
+        return
+
+    media_cache[url] = {"data": data, "etag": etag, "last_modified": last_modified, "checked": time.monotonic()}
+    media_cache_stats["bytes"] += len(data)
+    while media_cache_stats["bytes"] > media_cache_max_bytes:
+        _, evicted_entry = media_cache.popitem(last=False)
+        media_cache_stats["bytes"] -= len(evicted_entry["data"])
+
+
+# Function to receive a static asset, it is only downloaded again if the server has a newer version
+async def _media_cache_get(url: str):
+    """Returns the bytes of the asset or None if it can not be downloaded"""
+    entry = media_cache.get(url)
+    if entry is not None:
+        media_cache.move_to_end(url)
+        if time.monotonic() - entry["checked"] < media_cache_revalidate_after:
+            return entry["data"]
+
+    # Ask the server if our version is still valid
+    headers = {}
+    if entry is not None and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry is not None and entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        with _upstream_timer("discord_cdn"):
+            async with client.http_session.get(url, headers=headers, timeout=http_timeouts["discord_cdn"]) as response:
+                if response.status == 304 and entry is not None:
+                    entry["checked"] = time.monotonic()
+                    return entry["data"]
+                if response.status == 200:
+                    data = await response.read()
+                    _media_cache_store(url, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                    return data
+                log.warning(f"Media cache: {url} responded with {response.status}")
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        log.warning(f"Media cache: Could not download {url}")
+
+    # Use the old version if the server is not reachable
+    return entry["data"] if entry is not None else None
+
+
+# Function to revalidate all cached static assets, e.g. after they were loaded from the snapshot
+async def _media_cache_revalidate():
+    for url in list(media_cache):
+        entry = media_cache.get(url)
+        if entry is not None and time.monotonic() - entry["checked"] >= media_cache_revalidate_after:
+            await _media_cache_get(url)
+
+
+# Function to respond with a static asset, the URL of the first upload is reused instead of uploading the file again
+async def _send_cached_media(interaction: Interaction, url: str, filename: str):
+    attachment = media_attachments.get(url)
+    if attachment is not None and attachment[1] > time.monotonic():
+        return await interaction.response.send_message(attachment[0])
+
+    data = await _media_cache_get(url)
+    if data is None:
+        return await interaction.response.send_message("Could not download file...")
+    await interaction.response.send_message(file=File(io.BytesIO(data), filename))
+
+    # Remember the URL of the uploaded attachment, Discord attachment URLs expire after a while
+    message = await interaction.original_response()
+    if message.attachments:
+        media_attachments[url] = (message.attachments[0].url, time.monotonic() + media_attachment_ttl)
+
+
 # Function for Star Wars
 async def _init_command_starwars_static_response(interaction: Interaction):
     """A function to response with a starwars meme"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the starwars stattic command.")
+    await _send_cached_media(interaction, starwars_static_url, "star_wars.png")
+
+
+# Media Type Probe Cache (URL -> Extension), least recently used entries are removed first
+media_probe_cache = OrderedDict()
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get("https://media.discordapp.net/attachments/732222852606066788/1052919738034045008/fc5ed98c2b4952971ec03a495fc85d73.png") as resp:
-            if resp.status != 200:
-                return await interaction.response.send_message("Could not download file...")
-            data = io.BytesIO(await resp.read())
-            await interaction.response.send_message(file=File(data, "star_wars.png"))
+# Function to store a probed Media Type
+def _media_probe_cache_store(url: str, extension):
+    media_probe_cache[url] = extension
+    media_probe_cache.move_to_end(url)
+    while len(media_probe_cache) > media_probe_cache_size:
+        media_probe_cache.popitem(last=False)
+    return extension
+
+
+# Function to find out the media extension of an URL without downloading the file
+async def _media_probe_extension(url: str):
+    """Returns the extension of an URL (e.g. ".png") by only reading the response headers"""
+
+    # Check if URL was already probed
+    if url in media_probe_cache:
+        media_probe_cache.move_to_end(url)
+        return media_probe_cache[url]
+
+    # Fast Path: Check extension of the URL itself
+    extension = os.path.splitext(urlsplit(url).path)[1].lower()
+    if extension == ".jpeg":
+        extension = ".jpg"
+    if extension in media_extensions:
+        return _media_probe_cache_store(url, extension)
+
+    # Slow Path: Ask the server for the content type, first with HEAD and then with a ranged GET
+    for attempt in range(media_probe_retries + 1):
+        try:
+            with _upstream_timer("media_probe"):
+                async with client.http_session.head(url, allow_redirects=True, ssl=media_probe_ssl,
+                                                    timeout=http_timeouts["media_probe"]) as response:
+                    content_type = response.headers.get("content-type") if response.status < 400 else None
+
+                # Some servers do not support HEAD, only request the first byte of the file then
+                if content_type is None:
+                    async with client.http_session.get(url, headers={"Range": "bytes=0-0"}, ssl=media_probe_ssl,
+                                                       timeout=http_timeouts["media_probe"]) as response:
+                        content_type = response.headers.get("content-type") if response.status < 400 else None
+
+            if content_type is None:
+                return _media_probe_cache_store(url, None)
+
+            extension = mimetypes.guess_extension(content_type.split(";")[0].strip())
+            return _media_probe_cache_store(url, extension)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            log.warning(f"Media probe attempt {attempt + 1} failed for {url}")
+            if attempt < media_probe_retries:
+                await asyncio.sleep(0.25 * (attempt + 1))
+
+    # Do not cache network failures, the URL may be reachable next time
+    return None
+
+
+# Function to receive the read only Reddit instance, it is created once on the shared HTTP Session
+def _reddit_instance():
+    import asyncpraw
+    global reddit_client
+    if reddit_client is None:
+        reddit_client = asyncpraw.Reddit(
+            client_id = config_data.get("reddit_client_id"),
+            client_secret = config_data.get("reddit_client_secret"),
+            redirect_uri = config_data.get("reddit_redirect_uri"),
+            requestor_kwargs = {"session": client.http_session},
+            user_agent = config_data.get("reddit_user_agent"),
+            timeout = int(http_timeouts["reddit"].total),
+            check_for_async=False,
+            **reddit_urls)
+        reddit_client.read_only = True
+    return reddit_client
+
+
+# Function to resolve a Subreddit by name, returns None if the Subreddit does not exist
+async def _reddit_subreddit(subreddit_string: str):
+    name = subreddit_string.lower()
+
+    # Check if Subreddit was resolved recently
+    cache_entry = reddit_subreddit_cache.get(name)
+    if cache_entry is not None and cache_entry[0] > time.monotonic():
+        return cache_entry[1]
+
+    # Ask Reddit once for all concurrent callers of the same Subreddit
+    return await _single_flight(("reddit_subreddit", name), _reddit_subreddit_fetch, subreddit_string)
+
+
+# Function to ask Reddit for a Subreddit and remember the answer, also if the Subreddit does not exist
+async def _reddit_subreddit_fetch(subreddit_string: str):
+    import asyncprawcore
+    name = subreddit_string.lower()
+    reddit = _reddit_instance()
+    try:
+        with _upstream_timer("reddit"):
+            subreddit = [sub async for sub in reddit.subreddits.search_by_name(subreddit_string, exact=True)][0]
+        reddit_subreddit_cache[name] = (time.monotonic() + reddit_subreddit_cache_ttl, subreddit)
+    except asyncprawcore.exceptions.NotFound:
+        subreddit = None
+        reddit_subreddit_cache[name] = (time.monotonic() + reddit_subreddit_negative_ttl, subreddit)
+    return subreddit
 
 
 # Reddit API Function
 async def _reddit_api_request(interaction: Interaction, subreddit_string: str):
+    import asyncprawcore
     try:
-        raise Exception("Thousands of subreddits go dark protesting Reddit's new API Costs")
-        #t_0 = timeit.default_timer()
-        #async with aiohttp.ClientSession(trust_env=True) as session:
-        async with aiohttp.ClientSession() as session:
-            reddit = asyncpraw.Reddit(
-                client_id = config_data.get("reddit_client_id"),
-                client_secret = config_data.get("reddit_client_secret"),
-                redirect_uri = config_data.get("reddit_redirect_uri"),
-                requestor_kwargs = {"session": session},
-                user_agent = config_data.get("reddit_user_agent"),
-                check_for_async=False)
-            reddit.read_only = True
-
-            #t_1 = timeit.default_timer()
-
-            algorithm = 2
-
-            # Check if Subreddit exists
-            try:
-                subreddit = [sub async for sub in reddit.subreddits.search_by_name(subreddit_string, exact=True)]
-            except asyncprawcore.exceptions.NotFound:
-                print(f" > Exception: Subreddit \"{subreddit_string}\" not found")
-                await interaction.followup.send(f"Subreddit \"{subreddit_string}\" does not exist!")
-                raise
-            except asyncprawcore.exceptions.ServerError:
-                print(f" > Exception: Reddit Server not reachable")
-                await interaction.followup.send(f"Reddit Server not reachable!")
-                raise
-
-            if algorithm == 1:
-                # Get Hot Submissions
-                submission_limit = 200
-                submissions = []
-                random_number = random.randint(1,submission_limit-1)
-                async for submission in subreddit[0].hot(limit=submission_limit):
-                    submissions.append(submission)
-
-                # Get a Random Submission
-                submission = submissions[random_number]
-            if algorithm == 2:
-                submission = await subreddit[0].random()
-
-            #t_2 = timeit.default_timer()
-            #print(f" > Elapsed time init: {round((t_1 - t_0), 3)} sec")
-            #print(f" > Elapsed time post: {round((t_2 - t_1), 3)} sec")
-
-            # Return Random Submission
-            return submission
+        if not reddit_api_enabled:
+            raise Exception("Thousands of subreddits go dark protesting Reddit's new API Costs")
+
+        # Check if Subreddit exists
+        try:
+            subreddit = await _reddit_subreddit(subreddit_string)
+        except asyncprawcore.exceptions.ServerError:
+            log.warning(f"Exception: Reddit Server not reachable")
+            await interaction.followup.send(f"Reddit Server not reachable!")
+            raise
+        if subreddit is None:
+            log.info(f"Exception: Subreddit \"{subreddit_string}\" not found")
+            await interaction.followup.send(f"Subreddit \"{subreddit_string}\" does not exist!")
+            raise Exception(f"Subreddit \"{subreddit_string}\" not found")
+
+        # Get a Random Submission of the hot listing, Reddit has removed its random endpoint
+        listing = await _reddit_hot_listing(subreddit_string)
+        submission = random.choice(listing) if listing else None
+
+        # Return Random Submission, None if the Subreddit has no submissions
+        return submission
     except Exception:
         raise
 
 
+# Function to receive the Hot Submissions of a Subreddit
+async def _reddit_hot_submissions(subreddit_string: str, submission_limit: int = 200):
+    """Returns up to submission_limit hot submissions, use _reddit_hot_listing instead"""
+    subreddit = await _reddit_subreddit(subreddit_string)
+    if subreddit is None:
+        return None
+    with _upstream_timer("reddit"):
+        return [submission async for submission in subreddit.hot(limit=submission_limit)]
+
+
+# Function to receive the hot listing of a Subreddit, returns None if the Subreddit does not exist
+async def _reddit_hot_listing(subreddit_string: str):
+    name = subreddit_string.lower()
+
+    # Check if the listing was received recently
+    cache_entry = reddit_hot_cache.get(name)
+    if cache_entry is not None and cache_entry[0] > time.monotonic():
+        reddit_hot_cache.move_to_end(name)
+        return cache_entry[1]
+
+    # Ask Reddit once for all concurrent callers of the same Subreddit
+    return await _single_flight(("reddit_hot", name), _reddit_hot_listing_fetch, subreddit_string)
+
+
+# Function to ask Reddit for the hot listing of a Subreddit and remember it, use _reddit_hot_listing instead
+async def _reddit_hot_listing_fetch(subreddit_string: str):
+    name = subreddit_string.lower()
+    submissions = await _reddit_hot_submissions(subreddit_string)
+    if submissions is None:
+        return None
+
+    listing = [RedditMedia(submission.url, submission.title) for submission in submissions]
+    reddit_hot_cache[name] = (time.monotonic() + reddit_hot_cache_ttl, listing)
+    reddit_hot_cache.move_to_end(name)
+    while len(reddit_hot_cache) > reddit_hot_cache_size:
+        reddit_hot_cache.popitem(last=False)
+    return listing
+
+
+# Function to create the prefetch pool of a Subreddit, it is shared with the other workers in the sharded mode
+def _reddit_prefetch_pool(name: str):
+    if shared_state is not None:
+        return SharedPool(f"reddit:{name}", lambda item: RedditMedia(*item))
+    return deque()
+
+
+# Function to add a pool for a Subreddit of "/reddit" which exists, the background task fills it
+def _reddit_prefetch_register(subreddit_string: str):
+    name = subreddit_string.lower()
+    if not reddit_api_enabled or name in reddit_prefetch_pools:
+        return
+
+    # Only a limited number of Subreddits of "/reddit" get a pool, idle ones are removed by the background task
+    if len(reddit_prefetch_pools) - len(reddit_prefetch_subreddits) >= reddit_prefetch_dynamic_limit:
+        return
+    reddit_prefetch_pools[name] = _reddit_prefetch_pool(name)
+    reddit_prefetch_last_used[name] = time.monotonic()
+    reddit_prefetch_wakeup.set()
+
+
+# Function to take a prefetched Submission of a Subreddit, returns None if the pool is empty
+def _reddit_prefetch_pop(subreddit_string: str):
+    name = subreddit_string.lower()
+    pool = reddit_prefetch_pools.get(name)
+    if pool is None:
+        return None
+    reddit_prefetch_last_used[name] = time.monotonic()
+
+    try:
+        media = pool.popleft()
+    except IndexError:
+        media = None
+
+    # Remember served Submissions, so a refill does not queue them again
+    if media is not None:
+        reddit_prefetch_served[media.url] = True
+        while len(reddit_prefetch_served) > reddit_prefetch_served_size:
+            reddit_prefetch_served.popitem(last=False)
+
+    # Wake up the background task when the pool runs low
+    if len(pool) < reddit_prefetch_low_water:
+        reddit_prefetch_wakeup.set()
+    return media
+
+
+# Function to refill the prefetch pool of a Subreddit from its hot submissions
+async def _reddit_prefetch_refill(name: str):
+    pool = reddit_prefetch_pools[name]
+    listing = await _reddit_hot_listing(name)
+    if listing is None:
+        log.info(f"Prefetch: Subreddit \"{name}\" not found")
+        if name not in reddit_prefetch_subreddits:
+            reddit_prefetch_pools.pop(name, None)
+            reddit_prefetch_last_used.pop(name, None)
+        return
+    submissions = random.sample(listing, len(listing))
+
+    queued = {media.url for media in pool}
+    for submission in submissions:
+        if len(pool) >= reddit_prefetch_pool_size:
+            break
+        if submission.url in queued or submission.url in reddit_prefetch_served:
+            continue
+        if await _media_probe_extension(submission.url) in media_extensions:
+            pool.append(RedditMedia(submission.url, submission.title))
+            queued.add(submission.url)
+
+
+# Background Task which keeps the prefetch pools above the low water mark
+async def _reddit_prefetch_loop():
+    while True:
+        reddit_prefetch_wakeup.clear()
+
+        # Remove Subreddits from "/reddit" which were not used for a while
+        time_now = time.monotonic()
+        for name in list(reddit_prefetch_pools):
+            if name not in reddit_prefetch_subreddits and time_now - reddit_prefetch_last_used.get(name, 0) > reddit_prefetch_idle_timeout:
+                del reddit_prefetch_pools[name]
+                reddit_prefetch_last_used.pop(name, None)
+
+        # Refill every pool which is below the low water mark
+        for name in list(reddit_prefetch_pools):
+            if name not in reddit_prefetch_pools or len(reddit_prefetch_pools[name]) >= reddit_prefetch_low_water:
+                continue
+            try:
+                await _reddit_prefetch_refill(name)
+            except Exception:
+                log.exception(f"Exception occured prefetching \"{name}\"")
+
+        # Sleep until the next interval or until a pool runs low
+        try:
+            await asyncio.wait_for(reddit_prefetch_wakeup.wait(), timeout=reddit_prefetch_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+# Function to receive a Submission of a Subreddit, first from the prefetch pool and otherwise from Reddit directly
+async def _reddit_media_submission(interaction: Interaction, subreddit_string: str, validate: bool = True):
+    # Use an already validated Submission if available
+    media = _reddit_prefetch_pop(subreddit_string)
+    if media is not None:
+        return media
+
+    # Make sure the extension of the URL is jpg, png or gif, returns None if no media was found
+    for _ in range(reddit_media_attempts):
+        submission = await _reddit_api_request(interaction, subreddit_string)
+        if submission is None:
+            break
+        _reddit_prefetch_register(subreddit_string)
+
+        # Check extension of submission url
+        if not validate or await _media_probe_extension(submission.url) in media_extensions:
+            return RedditMedia(submission.url, submission.title)
+
+    log.info(f"No media found in r/{subreddit_string} after {reddit_media_attempts} Submissions")
+    await interaction.followup.send(f"No media found in r/{subreddit_string}!")
+    return None
+
+
 # Function for a picture, gif from any given subreddit
 async def _init_command_reddit_response(interaction: Interaction, subreddit: str):
     """A function to send a picture, gif from any given subreddit"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the reddit \"{subreddit}\" command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     # Check if parameter is a string
     if not isinstance(subreddit, str):
         return await interaction.followup.send(f"Exception, Parameter needs to be a string")
 
     try:
-        extension = None
-
-        # Make sure the extension of the URL is jpg, png or gif
-        while extension not in(".jpg", ".png", ".gif", ".gifv"):
-            submission = await _reddit_api_request(interaction, subreddit)
-
-            # Check extension of submission url
-            response = requests.get(submission.url, verify=os.path.dirname(__file__)+"/certs.pem")
-            content_type = response.headers["content-type"]
-            extension = mimetypes.guess_extension(content_type)
-            if extension in(".jpg", ".png", ".gif", ".gifv"):
-                break
+        submission = await _reddit_media_submission(interaction, subreddit)
+        if submission is None:
+            return
 
         # Send Content in Discord
         await interaction.followup.send(submission.url)
     except Exception:
-        print(f" > Exception occured processing reddit: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing reddit")
         await interaction.followup.send(f"Exception occured processing reddit. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -247,17 +1433,17 @@ async def _init_command_reddit_response(interaction: Interaction, subreddit: str
 async def _init_command_meme_response(interaction: Interaction):
     """A function to send a random meme using reddit api"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the meme command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        submission = await _reddit_api_request(interaction, "meme")
+        submission = await _reddit_media_submission(interaction, "meme", validate=False)
+        if submission is None:
+            return
         await interaction.followup.send(submission.url)
     except Exception:
-        print(f" > Exception occured processing meme: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing meme")
         await interaction.followup.send(f"Exception occured processing meme. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -266,30 +1452,19 @@ async def _init_command_meme_response(interaction: Interaction):
 async def _init_command_starwars_response(interaction: Interaction):
     """A function to send a random star wars meme using reddit api"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the starwars command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        extension = None
-
-        # Make sure the extension of the URL is jpg, png or gif
-        while extension not in(".jpg", ".png", ".gif", ".gifv"):
-            submission = await _reddit_api_request(interaction, "starwarsmemes")
-
-            # Check extension of submission url
-            response = requests.get(submission.url, verify=os.path.dirname(__file__)+"/certs.pem")
-            content_type = response.headers["content-type"]
-            extension = mimetypes.guess_extension(content_type)
-            if extension in(".jpg", ".png", ".gif", ".gifv"):
-                break
+        submission = await _reddit_media_submission(interaction, "starwarsmemes")
+        if submission is None:
+            return
 
         # Send Content in Discord
         await interaction.followup.send(submission.url)
     except Exception:
-        print(f" > Exception occured processing starwars: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing starwars")
         await interaction.followup.send(f"Exception occured processing starwars. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -298,17 +1473,17 @@ async def _init_command_starwars_response(interaction: Interaction):
 async def _init_command_gif_response(interaction: Interaction):
     """A function to send a random gif using reddit api"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the gif command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        submission = await _reddit_api_request(interaction, "gifs")
+        submission = await _reddit_media_submission(interaction, "gifs", validate=False)
+        if submission is None:
+            return
         await interaction.followup.send(submission.url)
     except Exception:
-        print(f" > Exception occured processing gif: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing gif")
         await interaction.followup.send(f"Exception occured processing gif. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -317,17 +1492,17 @@ async def _init_command_gif_response(interaction: Interaction):
 async def _init_command_art_response(interaction: Interaction):
     """A function to send a random art using reddit api"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the art command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        submission = await _reddit_api_request(interaction, "art")
+        submission = await _reddit_media_submission(interaction, "art", validate=False)
+        if submission is None:
+            return
         await interaction.followup.send(submission.url)
     except Exception:
-        print(f" > Exception occured processing art: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing art")
         await interaction.followup.send(f"Exception occured processing art. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -336,59 +1511,129 @@ async def _init_command_art_response(interaction: Interaction):
 async def _init_command_data_response(interaction: Interaction):
     """A function to send a random data using reddit api"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the dataisbeautiful command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        extension = None
-
-        # Make sure the extension of the URL is jpg, png or gif
-        while extension not in(".jpg", ".png", ".gif", ".gifv"):
-            submission = await _reddit_api_request(interaction, "dataisbeautiful")
-
-            # Check extension of submission url
-            response = requests.get(submission.url, verify=os.path.dirname(__file__)+"/certs.pem")
-            content_type = response.headers["content-type"]
-            extension = mimetypes.guess_extension(content_type)
-            if extension in(".jpg", ".png", ".gif", ".gifv"):
-                break
+        submission = await _reddit_media_submission(interaction, "dataisbeautiful")
+        if submission is None:
+            return
 
         # Send Content in Discord
         embed = Embed(title=submission.title)
         embed.set_image(url=submission.url)
         await interaction.followup.send(embed=embed)
     except Exception:
-        print(f" > Exception occured processing dataisbeautiful: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing dataisbeautiful")
         await interaction.followup.send(f"Exception occured processing dataisbeautiful. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
 
+# Function to request quotes from zenquotes.io, returns None if zenquotes is not available or rate limits us
+async def _zenquotes_request(endpoint: str):
+    """Concurrent callers of the same endpoint share one request"""
+    return await _single_flight(("zenquotes", endpoint), _zenquotes_fetch, endpoint)
+
+
+# Function to send a request to zenquotes.io, use _zenquotes_request instead
+async def _zenquotes_fetch(endpoint: str):
+    global quote_backoff_until
+
+    # Do not ask zenquotes again while it rate limits us
+    if time.monotonic() < quote_backoff_until:
+        return None
+
+    try:
+        with _upstream_timer("zenquotes"):
+            async with client.http_session.get(f"{zenquotes_url}/{endpoint}", timeout=http_timeouts["zenquotes"]) as response:
+                if response.status == 429:
+                    retry_after = response.headers.get("Retry-After", "")
+                    quote_backoff_until = time.monotonic() + (int(retry_after) if retry_after.isdigit() else quote_backoff_default)
+                    log.warning(f"zenquotes.io rate limit reached, pausing requests")
+                    return None
+                if response.status != 200:
+                    log.warning(f"zenquotes.io responded with {response.status} for {endpoint}")
+                    return None
+                quotes = await response.json(content_type=None)
+                return [f"{quote.get('q')} - {quote.get('a')}" for quote in quotes]
+    # Network errors and invalid responses are handled like an unavailable zenquotes, /qod keeps the last known quote
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        log.warning(f"zenquotes.io not reachable for {endpoint}")
+        return None
+
+
+# Function to receive the quote of the day, it is only requested once per UTC day
+async def _quote_of_the_day():
+    """Returns the quote of the day, or the last known one if zenquotes is not available"""
+    today = datetime.now(timezone.utc).date()
+    if quote_of_the_day["date"] != today:
+        quotes = await _zenquotes_request("today")
+        if quotes:
+            quote_of_the_day["date"] = today
+            quote_of_the_day["quote"] = quotes[0]
+    return quote_of_the_day["quote"]
+
+
+# Function to take a random quote from the quote pool, returns None if the pool is empty
+def _quote_pool_pop():
+    try:
+        quote = quote_pool.popleft()
+    except IndexError:
+        quote = None
+
+    # Wake up the background task when the pool runs low
+    if len(quote_pool) < quote_pool_low_water:
+        quote_pool_wakeup.set()
+    return quote
+
+
+# Function to fill the quote pool with the batch endpoint of zenquotes, concurrent callers wait for the same refill
+async def _quote_pool_refill():
+    await _single_flight(("quote_pool",), _quote_pool_fill)
+
+
+# Function to add a batch of zenquotes to the quote pool, use _quote_pool_refill instead
+async def _quote_pool_fill():
+    quotes = await _zenquotes_request("quotes")
+    if quotes:
+        random.shuffle(quotes)
+        quote_pool.extend(quotes)
+
+
+# Background Task which fills the quote pool with the batch endpoint of zenquotes
+async def _quote_pool_loop():
+    while True:
+        quote_pool_wakeup.clear()
+        if len(quote_pool) < quote_pool_low_water:
+            try:
+                await _quote_pool_refill()
+            except Exception:
+                log.exception(f"Exception occured refilling quote pool")
+
+        # Sleep until the next interval or until the pool runs low
+        try:
+            await asyncio.wait_for(quote_pool_wakeup.wait(), timeout=quote_pool_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
 # Function to receive quote of the day
 async def _init_command_qod_response(interaction: Interaction):
     """A function to send a qod quote"""
 
-    # Repsond in the console that the command has ben ran
-    print(f"> {interaction.guild} : {interaction.user} used the qod command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            quote_url = "https://zenquotes.io/api/today"
-            async with session.get(quote_url) as response:
-                if response.status == 200:
-                    quote = await response.json()
-                    quote_str = quote[0].get("q")
-                    author_str = quote[0].get("a")
-                    await interaction.followup.send(f"{quote_str} - {author_str}")
-                else:
-                    await interaction.followup.send(f"{response.status}: Could not send quote of the day...")
+        quote = await _quote_of_the_day()
+        if quote is not None:
+            await interaction.followup.send(quote)
+        else:
+            await interaction.followup.send(f"Could not send quote of the day, please try again later...")
     except Exception:
-        print(f" > Exception occured processing qod: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing qod")
         await interaction.followup.send(f"Exception occured processing qod. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -397,38 +1642,509 @@ async def _init_command_qod_response(interaction: Interaction):
 async def _init_command_quote_response(interaction: Interaction):
     """A function to send a random quote """
 
-    # Repsond in the console that the command has ben ran
-    print(f"> {interaction.guild} : {interaction.user} used the quote command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            quote_url = "https://zenquotes.io/api/random"
-            async with session.get(quote_url) as response:
-                if response.status == 200:
-                    quote = await response.json()
-                    quote_str = quote[0].get("q")
-                    author_str = quote[0].get("a")
-                    await interaction.followup.send(f"{quote_str} - {author_str}")
-                else:
-                    await interaction.followup.send(f"{response.status}: Could not send quote...")
+        # Use a quote of the pool, if it is empty all waiting users share one batch request
+        quote = _quote_pool_pop()
+        if quote is None:
+            await _quote_pool_refill()
+            quote = _quote_pool_pop()
+
+        if quote is not None:
+            await interaction.followup.send(quote)
+        else:
+            await interaction.followup.send(f"Could not send quote, please try again later...")
     except Exception:
-        print(f" > Exception occured processing quote: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing quote")
         await interaction.followup.send(f"Exception occured processing quote. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
 
+# Function to fetch a resource only once for all concurrent callers, the key names the resource (e.g. ("zenquotes", "today"))
+async def _single_flight(key: tuple, function, *args):
+    """Callers which arrive while the fetch is running wait for it and receive the same result or exception
+
+    A cancelled caller does not cancel the fetch for the others, it is only cancelled when no caller waits anymore."""
+    flight = single_flight_tasks.get(key)
+    if flight is None:
+        flight = {"task": asyncio.create_task(function(*args)), "waiters": 0}
+        single_flight_tasks[key] = flight
+        flight["task"].add_done_callback(lambda task: single_flight_tasks.pop(key, None) if single_flight_tasks.get(key) is flight else None)
+    else:
+        _metrics_count("single_flight_shared_total", resource=key[0])
+
+    flight["waiters"] += 1
+    try:
+        return await asyncio.shield(flight["task"])
+    except asyncio.CancelledError:
+        if flight["waiters"] == 1 and not flight["task"].done():
+            flight["task"].cancel()
+            if single_flight_tasks.get(key) is flight:
+                del single_flight_tasks[key]
+        raise
+    finally:
+        flight["waiters"] -= 1
+
+
+# Function to run blocking code (Dropbox SDK, Excel parsing) in the blocking executor, so the event loop keeps running
+async def _run_blocking(function, *args, timeout: float = None, **kwargs):
+    blocking_executor_stats["pending"] += 1
+    blocking_executor_stats["peak"] = max(blocking_executor_stats["peak"], blocking_executor_stats["pending"])
+    try:
+        future = asyncio.get_running_loop().run_in_executor(blocking_executor, functools.partial(function, *args, **kwargs))
+        return await asyncio.wait_for(future, timeout=timeout)
+    except asyncio.TimeoutError:
+        blocking_executor_stats["timeouts"] += 1
+        log.warning(f"Blocking call {getattr(function, '__name__', function)} timed out after {timeout} seconds")
+        raise
+    finally:
+        blocking_executor_stats["pending"] -= 1
+
+
+# Function to save a json file, it is written to a temporary file first and then renamed so it can never be truncated
+# Every save has its own temporary file, so saves of the same file at the same time do not overwrite each other
+async def _json_save(path: str, data):
+    json_path = os.path.abspath(path)
+    temp_path = f"{json_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        async with aiofiles.open(temp_path, mode="w") as jsonfile:
+            await jsonfile.write(json.dumps(data, indent=4))
+        os.replace(temp_path, json_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+
+
+# Function to collect the derived caches for the snapshot, monotonic times are stored as wall clock times
+def _snapshot_collect():
+    """Runs on the event loop, everything which can change while the snapshot is written is copied"""
+    time_offset = time.time() - time.monotonic()
+    return {
+        "version": snapshot_version,
+        "written": time.time(),
+        "vip_roster": {key: vip_roster[key] for key in ("rev", "content_hash", "rows", "end_dates", "by_discord", "by_steam")}
+                      if vip_owner and vip_roster["rows"] is not None else None,
+        "vip_member_links": dict(vip_member_links),
+        "reddit_subreddits": {name: (expires + time_offset, subreddit.display_name if subreddit is not None else None)
+                              for name, (expires, subreddit) in reddit_subreddit_cache.items()},
+        # The pools of the sharded mode are already stored in the shared state database
+        "reddit_prefetch_pools": {name: [tuple(media) for media in pool] for name, pool in reddit_prefetch_pools.items()} if shared_state is None else {},
+        "reddit_prefetch_served": list(reddit_prefetch_served),
+        "quote_pool": list(quote_pool) if shared_state is None else [],
+        "quote_of_the_day": dict(quote_of_the_day),
+        "media_cache": {url: (entry["data"], entry["etag"], entry["last_modified"]) for url, entry in media_cache.items()},
+        "media_attachments": {url: (attachment_url, expires + time_offset) for url, (attachment_url, expires) in media_attachments.items()},
+        "media_probe_cache": dict(media_probe_cache),
+    }
+
+
+# Function to write the snapshot, runs in the blocking executor
+def _snapshot_write(path: str, snapshot: dict):
+    with snapshot_write_lock:
+        roster = snapshot["vip_roster"]
+        if roster is not None and snapshot_roster_cache["rev"] != (roster["rev"], roster["content_hash"]):
+            snapshot_roster_cache["data"] = pickle.dumps(roster, protocol=pickle.HIGHEST_PROTOCOL)
+            snapshot_roster_cache["rev"] = (roster["rev"], roster["content_hash"])
+        snapshot["vip_roster"] = snapshot_roster_cache["data"] if roster is not None else None
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+
+# Function to read the snapshot, runs in the blocking executor
+def _snapshot_read(path: str):
+    with open(path, "rb") as snapshot_file:
+        snapshot = pickle.load(snapshot_file)
+    if snapshot.get("version") != snapshot_version:
+        return None
+    if snapshot["vip_roster"] is not None:
+        snapshot["vip_roster"] = pickle.loads(snapshot["vip_roster"])
+    return snapshot
+
+
+# Function to save the snapshot of the derived caches
+async def _snapshot_save():
+    time_start = time.perf_counter()
+    await _run_blocking(_snapshot_write, os.path.abspath(_worker_path(snapshot_path)), _snapshot_collect(),
+                        timeout=blocking_timeouts["snapshot"])
+    _metrics_observe("snapshot_seconds", time.perf_counter() - time_start, operation="save")
+
+
+# Function to load the snapshot of the last run, the caches are revalidated by the background tasks afterwards
+async def _snapshot_load():
+    path = _worker_path(snapshot_path)
+    if not os.path.exists(path):
+        return
+    time_start = time.perf_counter()
+    try:
+        snapshot = await _run_blocking(_snapshot_read, path, timeout=blocking_timeouts["snapshot"])
+    except Exception:
+        log.exception(f"Exception occured loading snapshot, starting cold")
+        return
+    if snapshot is None:
+        log.info(f"Snapshot has an old version, starting cold")
+        return
+    time_now = time.time()
+    time_offset = time_now - time.monotonic()
+
+    # VIP roster, the revision is checked on Dropbox by the VIP roster task
+    if vip_owner and snapshot["vip_roster"] is not None:
+        vip_roster.update(snapshot["vip_roster"])
+        vip_roster["checked"] = float("-inf")
+    vip_member_links.update(snapshot["vip_member_links"])
+
+    # Resolved Subreddits which have not expired yet
+    if snapshot["reddit_subreddits"]:
+        reddit = _reddit_instance()
+        for name, (expires, display_name) in snapshot["reddit_subreddits"].items():
+            if expires > time_now:
+                subreddit = await reddit.subreddit(display_name) if display_name is not None else None
+                reddit_subreddit_cache[name] = (expires - time_offset, subreddit)
+
+    # Prefetched Submissions and Quotes
+    for name, pool in snapshot["reddit_prefetch_pools"].items():
+        _reddit_prefetch_register(name)
+        if name in reddit_prefetch_pools:
+            reddit_prefetch_pools[name].extend(RedditMedia(*media) for media in pool)
+    for url in snapshot["reddit_prefetch_served"]:
+        reddit_prefetch_served[url] = True
+    quote_pool.extend(snapshot["quote_pool"])
+    quote_of_the_day.update(snapshot["quote_of_the_day"])
+
+    # Static Assets are revalidated with the server before they are used the next time
+    for url, (data, etag, last_modified) in snapshot["media_cache"].items():
+        _media_cache_store(url, data, etag, last_modified)
+        if url in media_cache:
+            media_cache[url]["checked"] = float("-inf")
+    for url, (attachment_url, expires) in snapshot["media_attachments"].items():
+        if expires > time_now:
+            media_attachments[url] = (attachment_url, expires - time_offset)
+    for url, extension in snapshot["media_probe_cache"].items():
+        _media_probe_cache_store(url, extension)
+
+    _metrics_observe("snapshot_seconds", time.perf_counter() - time_start, operation="load")
+    log.info(f"Loaded snapshot of {datetime.fromtimestamp(snapshot['written']):%Y-%m-%d %H:%M:%S}: "
+             f"VIP roster {'rev ' + vip_roster['rev'] if vip_roster['rev'] else 'empty'}, {len(reddit_subreddit_cache)} Subreddits, "
+             f"{sum(len(pool) for pool in reddit_prefetch_pools.values())} prefetched Submissions, {len(quote_pool)} Quotes, {len(media_cache)} Assets")
+
+
+# Background Task which writes the snapshot periodically
+async def _snapshot_loop():
+    while True:
+        await asyncio.sleep(snapshot_interval)
+        try:
+            await _snapshot_save()
+        except Exception:
+            log.exception(f"Exception occured saving snapshot")
+
+
+# Function to load the fingerprints of the last synced commands
+async def _command_sync_load():
+    global command_sync_fingerprints
+    command_sync_fingerprints = {}
+    if os.path.exists(command_sync_path):
+        async with aiofiles.open(command_sync_path, 'r') as jsonfile:
+            raw_json = await jsonfile.read()
+            command_sync_fingerprints = json.loads(raw_json)
+
+
+# Function to receive the Dropbox instance, it is created once from the loaded config
+def _dropbox_client():
+    import dropbox
+    global dropbox_client
+    if dropbox_client is None:
+        dropbox_client = dropbox.Dropbox(oauth2_access_token = config_data.get("dropbox_token"),
+                                         oauth2_refresh_token = config_data.get("dropbox_refresh_token"),
+                                         oauth2_access_token_expiration = datetime.strptime(config_data.get("dropbox_token_expire"), "%Y-%m-%d %H:%M:%S.%f"),
+                                         app_key = config_data.get("dropbox_app_key"),
+                                         app_secret = config_data.get("dropbox_app_secret"),
+                                         user_agent = config_data.get("dropbox_user_agent"))
+    return dropbox_client
+
+
+# Background Task which refreshes the Dropbox Access Token before it expires and saves it into the config
+async def _dropbox_token_loop():
+    while True:
+        try:
+            dropbox_cloud = _dropbox_client()
+
+            # Refresh the Access Token if it expires soon
+            time_left = (dropbox_cloud._oauth2_access_token_expiration - datetime.utcnow()).total_seconds()
+            if time_left <= dropbox_token_refresh_margin:
+                log.info("Dropbox Access Token expires soon. Refreshing...")
+                with _upstream_timer("dropbox_token"):
+                    await _run_blocking(dropbox_cloud.refresh_access_token, timeout=blocking_timeouts["dropbox"])
+
+            # Save the Access Token if it has changed, also if the Dropbox SDK refreshed it by itself
+            if dropbox_cloud._oauth2_access_token != config_data.get("dropbox_token"):
+                config_data["dropbox_token"] = dropbox_cloud._oauth2_access_token
+                config_data["dropbox_token_expire"] = dropbox_cloud._oauth2_access_token_expiration.strftime("%Y-%m-%d %H:%M:%S.%f")
+                await _json_save("config.json", config_data)
+
+            # Sleep until the Access Token has to be refreshed again
+            time_left = (dropbox_cloud._oauth2_access_token_expiration - datetime.utcnow()).total_seconds()
+            sleep_time = min(max(time_left - dropbox_token_refresh_margin, 1), dropbox_token_check_interval)
+        except Exception:
+            log.exception(f"Exception occured refreshing Dropbox Access Token")
+            sleep_time = 60
+        await asyncio.sleep(sleep_time)
+
+
+# Function to convert an End Date cell of the VIP Excel Sheet, returns None if the row has no End Date
+def _vip_end_date(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if isinstance(value, str) and value.strip():
+        try:
+            return datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    # Empty cells and "00:00:00" time cells
+    return None
+
+
+# Function to convert a cell of the VIP Excel Sheet like pandas did, openpyxl returns whole numbers (e.g. Steam IDs) as float
+def _vip_cell(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# Function to parse the VIP Excel Sheet, runs in the blocking executor
+def _vip_roster_parse(content: bytes):
+    """Streams the VIP Excel Sheet row by row and only keeps the used columns as VipRow records"""
+    import numpy
+    import openpyxl
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        rows = []
+        non_empty_rows = 0
+        for cells in workbook.worksheets[0].iter_rows(max_col=max(vip_roster_columns) + 1, values_only=True):
+            # Empty rows are skipped and the first rows up to the header are not part of the roster
+            if all(cell is None or cell == "" for cell in cells):
+                continue
+            non_empty_rows += 1
+            if non_empty_rows <= vip_roster_header + 1:
+                continue
+
+            cells = cells + (None,) * (max(vip_roster_columns) + 1 - len(cells))
+            game_name, discord_name, end_date, steam_id = (_vip_cell(cells[column]) for column in vip_roster_columns)
+            rows.append(VipRow(game_name,
+                               None if discord_name is None else str(discord_name),
+                               _vip_end_date(end_date),
+                               steam_id))
+    finally:
+        workbook.close()
+
+    # Index rows by Discord Name and Steam ID
+    by_discord = {}
+    by_steam = {}
+    for key, row in enumerate(rows):
+        if row.discord_name is not None:
+            by_discord.setdefault(row.discord_name, []).append(key)
+        if row.steam_id is not None:
+            by_steam.setdefault(str(row.steam_id), key)
+
+    # End Date column as one array for the classification, NaT for rows without End Date
+    end_dates = numpy.array([numpy.datetime64("NaT") if row.end_date is None else numpy.datetime64(row.end_date, "us") for row in rows],
+                            dtype="datetime64[us]")
+
+    return {
+        "rows": rows,
+        "end_dates": end_dates,
+        "by_discord": by_discord,
+        "by_steam": by_steam,
+    }
+
+
+# Function to classify all rows of the VIP roster at once
+def _vip_roster_classify(roster, time_now: datetime, expiring_days: int, expired_days: int):
+    """Returns the days left of every row and boolean masks for the row groups used by the reports"""
+    import numpy
+    end_dates = roster["end_dates"]
+    has_date = ~numpy.isnat(end_dates)
+
+    # The first row below the header is not a VIP entry
+    has_date &= numpy.arange(len(end_dates)) >= 1
+
+    # Same as timedelta.days, rounded down to full days
+    days_left = (numpy.where(has_date, end_dates, numpy.datetime64(time_now, "us")) - numpy.datetime64(time_now, "us")) // numpy.timedelta64(1, "D")
+
+    return {
+        "days_left": days_left,
+        "no_date": ~has_date,
+        "active": has_date & (days_left >= 0),
+        "expired": has_date & (days_left <= -1),
+        "expiring": has_date & (days_left >= 0) & (days_left <= expiring_days),
+        "recently_expired": has_date & (days_left <= -1) & (days_left >= -expired_days),
+    }
+
+
+# Function to download and parse the VIP Excel Sheet, only if the file on Dropbox has changed
+async def _vip_roster_refresh(force: bool = False):
+    """Checks the revision of the VIP Excel Sheet on Dropbox and reloads the roster if it changed
+
+    Commands and the background task which refresh at the same time share one check."""
+    return await _single_flight(("dropbox_metadata", config_data.get("dropbox_filepath"), force), _vip_roster_reload, force)
+
+
+# Function to check the revision of the VIP Excel Sheet and reload it, use _vip_roster_refresh instead
+async def _vip_roster_reload(force: bool):
+    async with vip_roster_lock:
+        dropbox_cloud = _dropbox_client()
+        dropbox_path = config_data.get("dropbox_filepath")
+
+        # Only the metadata is required to find out if the file has changed
+        with _upstream_timer("dropbox_metadata"):
+            dropbox_metadata = await _run_blocking(dropbox_cloud.files_get_metadata, dropbox_path,
+                                                   timeout=blocking_timeouts["dropbox"])
+        vip_roster["checked"] = time.monotonic()
+        if not force and vip_roster["rev"] == dropbox_metadata.rev and vip_roster["content_hash"] == dropbox_metadata.content_hash:
+            return vip_roster
+
+        # Download and parse the File, a revision is only downloaded once
+        log.info(f"VIP roster changed (rev {dropbox_metadata.rev}). Reloading...")
+        parsed_roster = await _single_flight(("dropbox_download", dropbox_path, dropbox_metadata.rev),
+                                             _vip_roster_download, dropbox_path, dropbox_metadata.rev)
+
+        vip_roster.update(parsed_roster)
+        vip_roster["rev"] = dropbox_metadata.rev
+        vip_roster["content_hash"] = dropbox_metadata.content_hash
+        _vip_roster_link_members()
+        return vip_roster
+
+
+# Function to download and parse a revision of the VIP Excel Sheet
+async def _vip_roster_download(dropbox_path: str, rev: str):
+    dropbox_cloud = _dropbox_client()
+
+    # Download File
+    with _upstream_timer("dropbox_download"):
+        _,dropbox_download = await _run_blocking(dropbox_cloud.files_download, dropbox_path, rev=rev,
+                                                 timeout=blocking_timeouts["dropbox"])
+
+    # Parse File
+    with _upstream_timer("excel_parse"):
+        return await _run_blocking(_vip_roster_parse, dropbox_download.content,
+                                   timeout=blocking_timeouts["excel_parse"])
+
+
+# Function to add a member to the member name index
+def _member_index_add(member):
+    member_index["name"][member.name] = member.id
+    member_index["tag"][f"{member.name}#{member.discriminator}"] = member.id
+    for display_name in (member.global_name, getattr(member, "nick", None)):
+        if display_name is not None:
+            member_index["display"].setdefault(display_name, set()).add(member.id)
+
+
+# Function to remove a member from the member name index
+def _member_index_remove(member):
+    if member_index["name"].get(member.name) == member.id:
+        del member_index["name"][member.name]
+    if member_index["tag"].get(f"{member.name}#{member.discriminator}") == member.id:
+        del member_index["tag"][f"{member.name}#{member.discriminator}"]
+    for display_name in (member.global_name, getattr(member, "nick", None)):
+        if display_name is not None:
+            member_index["display"].get(display_name, set()).discard(member.id)
+
+
+# Function to build the member name index of the Feierabend Guild
+def _member_index_build(guild):
+    for index in member_index.values():
+        index.clear()
+    for member in guild.members:
+        _member_index_add(member)
+    _vip_roster_link_members()
+
+
+# Function to find a member of the Feierabend Guild by name, like guild.get_member_named but without scanning all members
+def _member_named(name: str):
+    guild = client.get_guild(feierabend_id)
+    if guild is None or name is None:
+        return None
+
+    # "name#discriminator" is checked first, then the unique username and at last the global name or nickname
+    member_id = member_index["tag"].get(name) if "#" in name else None
+    if member_id is None:
+        member_id = member_index["name"].get(name)
+    if member_id is None and member_index["display"].get(name):
+        member_id = next(iter(member_index["display"][name]))
+    return guild.get_member(member_id) if member_id is not None else None
+
+
+# Function to find the member of a Discord Name of the VIP roster, also if the member has changed the name since
+def _vip_roster_member(discord_name: str):
+    if discord_name is None:
+        return None
+    member = _member_named(discord_name)
+    if member is not None:
+        vip_member_links[discord_name] = member.id
+        return member
+
+    # Member which was found with this name before
+    guild = client.get_guild(feierabend_id)
+    if guild is not None and discord_name in vip_member_links:
+        return guild.get_member(vip_member_links[discord_name])
+    return None
+
+
+# Function to link the rows of the VIP roster to members (Member ID -> Rows)
+def _vip_roster_link_members():
+    by_member = {}
+    for discord_name, keys in vip_roster["by_discord"].items():
+        member = _vip_roster_member(discord_name)
+        if member is not None:
+            by_member.setdefault(member.id, []).extend(keys)
+    vip_roster["by_member"] = by_member
+
+
+# Function to link a single member to the rows of the VIP roster, used when a member joins or changes the name
+def _vip_roster_link_member(member):
+    for name in (member.name, f"{member.name}#{member.discriminator}", member.global_name, member.nick):
+        if name is not None and name in vip_roster["by_discord"] and _member_named(name) == member:
+            vip_member_links[name] = member.id
+            keys = vip_roster["by_member"].setdefault(member.id, [])
+            keys.extend(key for key in vip_roster["by_discord"][name] if key not in keys)
+
+
+# Function to receive the VIP roster, Dropbox is only asked for changes when the last check is older than max_age seconds
+async def _vip_roster(max_age: float = None):
+    if max_age is None:
+        max_age = vip_roster_max_age
+    if vip_roster["rows"] is None or time.monotonic() - vip_roster["checked"] > max_age:
+        await _vip_roster_refresh()
+    return vip_roster
+
+
+# Background Task which keeps the VIP roster up to date
+async def _vip_roster_loop():
+    while True:
+        try:
+            await _vip_roster_refresh()
+        except Exception:
+            log.exception(f"Exception occured refreshing VIP roster")
+        await asyncio.sleep(vip_roster_interval)
+
+
 # Function for VIPs to check how many days they have left
 async def _init_command_vipinfo_response(interaction: Interaction):
     """A function to check how many days a given user has left"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the vipstatus command.")
-
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
+
+    # Only the worker with the shard of the Feierabend Guild has its members and roles
+    if client.get_guild(feierabend_id) is None:
+        return await interaction.followup.send(f"VIP commands are only available on the Feierabend Server")
 
     # Variable for Roles
     has_rights = False
@@ -448,119 +2164,62 @@ async def _init_command_vipinfo_response(interaction: Interaction):
     # Continue only when User has rights
     if has_rights:
         try:
-            # Read Config File
-            async with aiofiles.open("config.json", 'r') as jsonfile:
-                raw_json = await jsonfile.read()
-                config_data = json.loads(raw_json)
-
-            # Connect to Dropbox
-            dropbox_cloud = dropbox.Dropbox(oauth2_access_token = config_data.get("dropbox_token"),
-                                            oauth2_refresh_token = config_data.get("dropbox_refresh_token"),
-                                            oauth2_access_token_expiration = datetime.strptime(config_data.get("dropbox_token_expire"), "%Y-%m-%d %H:%M:%S.%f"),
-                                            app_key = config_data.get("dropbox_app_key"),
-                                            app_secret = config_data.get("dropbox_app_secret"),
-                                            user_agent = config_data.get("dropbox_user_agent"))
-
-            # Check if Dropbox Access Token is still valid
-            old_dropbox_token = dropbox_cloud._oauth2_access_token
-            dropbox.Dropbox.check_and_refresh_access_token(dropbox_cloud)
-            new_dropbox_token = dropbox_cloud._oauth2_access_token
-
-            # If there is a new Dropbox Token available, save it into json and create new dropbox session
-            if old_dropbox_token != new_dropbox_token:
-                print(" > Dropbox Access Token is expired. Refreshing...")
-                async with aiofiles.open("config.json", mode="w") as jsonfile:
-                    config_data["dropbox_token"] = new_dropbox_token
-                    config_data["dropbox_token_expire"] = str(datetime.utcnow() + timedelta(seconds=14400))
-                    jsonstring = json.dumps(config_data, indent=4)
-                    await jsonfile.write(jsonstring)
-
-                # Create an new dropbox session
-                dropbox_cloud = dropbox.Dropbox.clone(dropbox_cloud, oauth2_access_token = new_dropbox_token)
-
-            dropbox_path = config_data.get("dropbox_filepath")
-
-            # Download File
-            async with aiofiles.open("temp.xlsx", mode="wb") as dropbox_file:
-                _,dropbox_download = dropbox_cloud.files_download(dropbox_path)
-                await dropbox_file.write(dropbox_download.content)
-
-            # Read out File
-            async with aiofiles.open("temp.xlsx", mode="rb") as dropbox_file:
-                dropbox_content = await dropbox_file.read()
-                dropbox_excel = pandas.read_excel(dropbox_content, header=3)
-                excel_output = pandas.DataFrame(data=dropbox_excel)
-                excel_json = json.loads(excel_output.to_json())
-
-                # Find User based on Discord User in Excel Sheet
-                keyentry = False
-
-                discord_users = excel_json.get("Unnamed: 2")
-
-                for key, user in discord_users.items():
-                    if user is not None:
-                        if guild.get_member_named(user) == interaction.user:
-                            keyentry = key
-                            break
-
-                # Find remaining days for given User
-                if keyentry == False and has_vip:
-                    # If User was not found but has VIP Role (Bought VIP via Tip4Server)
-                    vip_channel_id = guild.get_channel(1196074086980407367)
-                    vip_messages = ""
-                    time_now = datetime.now()
-                    async for message in vip_channel_id.history(limit=1000):
-                        if str(interaction.user.name) in message.content:
-                            # Regex Patterns for VIP Packet Name and Datetime
-                            vip_packet_pattern = r"^([^\s]+)"
-                            datetime_pattern = r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})"
-
-                            # Find datetime in message
-                            datetime_var = re.search(datetime_pattern, message.content)
-                            if datetime_var:
-                                # Extract datetime String
-                                datetime_str = datetime_var.group(1)
-
-                                # Parse the datetime string into a datetime object and calculate time left
-                                time_end = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
-                                time_left = time_end - time_now
-
-                                # Check if time_end is in future
-                                if time_left.days >= -1:
-                                    vip_packet_name_var = re.search(vip_packet_pattern, message.content)
-
-                                    # Extract VIP Packet Name if Time is in future
-                                    if vip_packet_name_var:
-                                        vip_packet_name = vip_packet_name_var.group(1)
-
-                                    # Append VIP Packet and Days left in message
-                                    vip_messages += f"You have **{vip_packet_name}** for **{time_left.days + 1} {'day' if time_left.days == 0 else 'days'}** left!\n"
-                    if not "".__eq__(vip_messages):
-                        return await interaction.followup.send(f"{interaction.user.mention}\n{vip_messages}")
-                    else:
-                        return await interaction.followup.send(f"{interaction.user.mention} it seems like you have VIP since earlier than **14.01.2024**. Only activated VIP after 14.01.2024 have access to this command, required data is only available since then.")
+            # Receive VIP roster, Dropbox is only asked for changes
+            roster = await _vip_roster()
+
+            # Find User based on Discord User in Excel Sheet, rows without End Date are ignored
+            keyentry = False
 
-                if keyentry == False and not(has_vip):
-                    return await interaction.followup.send(f"{interaction.user.mention} it seems like you do not have VIP on this Server. Please Check out <#1047547059433119777> for more Information.")
-                if keyentry != False:
-                    # Send information how many days a user has VIP left if User was found
-                    time_now = datetime.now()
-                    time_end = pandas.to_datetime(excel_output["Unnamed: 4"].values[int(keyentry)])
-                    steam_id = excel_output["Unnamed: 7"].values[int(key)]
+            # If the User has more than one row, the row with the latest End Date is used
+            user_keys = [key for key in roster["by_member"].get(interaction.user.id, ()) if roster["rows"][key].end_date is not None]
+            if user_keys:
+                keyentry = max(user_keys, key=lambda key: roster["rows"][key].end_date)
 
+            # Find remaining days for given User
+            if keyentry is False and has_vip:
+                # If User was not found but has VIP Role (Bought VIP via Tip4Server)
+                vip_messages = ""
+                time_now = datetime.now()
+
+                # Make sure the purchase index contains all messages of the VIP channel
+                if not vip_purchases["backfilled"]:
+                    await _vip_purchases_backfill()
+
+                for vip_packet_name, time_end in _vip_purchases_lookup(str(interaction.user.name)):
+                    # Calculate time left
                     time_left = time_end - time_now
 
+                    # Check if time_end is in future
                     if time_left.days >= -1:
-                        # Check if VIP Role is not in Useres Roles List, and add it if it is not existent
-                        if not vip_role in interaction.user.roles:
-                            await interaction.user.add_roles(vip_role)
-                        await interaction.followup.send(f"{interaction.user.mention} you have VIP for **{time_left.days + 1} {'day' if time_left.days == 0 else 'days'}** left!")
-                    else:
-                        await interaction.user.remove_roles(vip_role)
-                        await interaction.followup.send(f"{interaction.user.mention} your VIP Status has **expired** since **{(time_left.days + 1) * -1} {'day' if time_left.days == -2 else 'days'}**!\nPlease Check out <#1047547059433119777> for more Information.")
-                        await mods_channel.send(f"{interaction.user.mention} **{interaction.user}** his VIP has expired. Steam ID: **{steam_id}**")
+                        # Append VIP Packet and Days left in message
+                        vip_messages += f"You have **{vip_packet_name}** for **{time_left.days + 1} {'day' if time_left.days == 0 else 'days'}** left!\n"
+                if not "".__eq__(vip_messages):
+                    return await interaction.followup.send(f"{interaction.user.mention}\n{vip_messages}")
+                else:
+                    return await interaction.followup.send(f"{interaction.user.mention} it seems like you have VIP since earlier than **14.01.2024**. Only activated VIP after 14.01.2024 have access to this command, required data is only available since then.")
+
+            if keyentry is False and not(has_vip):
+                return await interaction.followup.send(f"{interaction.user.mention} it seems like you do not have VIP on this Server. Please Check out <#1047547059433119777> for more Information.")
+            if keyentry is not False:
+                # Send information how many days a user has VIP left if User was found
+                time_now = datetime.now()
+                time_end = roster["rows"][keyentry].end_date
+                steam_id = roster["rows"][keyentry].steam_id
+
+                time_left = time_end - time_now
+
+                if time_left.days >= -1:
+                    # Check if VIP Role is not in Useres Roles List, and add it if it is not existent
+                    if not vip_role in interaction.user.roles:
+                        await interaction.user.add_roles(vip_role)
+                    await interaction.followup.send(f"{interaction.user.mention} you have VIP for **{time_left.days + 1} {'day' if time_left.days == 0 else 'days'}** left!")
+                else:
+                    await interaction.user.remove_roles(vip_role)
+                    await interaction.followup.send(f"{interaction.user.mention} your VIP Status has **expired** since **{(time_left.days + 1) * -1} {'day' if time_left.days == -2 else 'days'}**!\nPlease Check out <#1047547059433119777> for more Information.")
+                    await mods_channel.send(f"{interaction.user.mention} **{interaction.user}** his VIP has expired. Steam ID: **{steam_id}**")
         except Exception:
-            print(f" > Exception occured processing vipstatus: {traceback.format_exc()}")
+            interaction.extras["outcome"] = "error"
+            log.exception(f"Exception occured processing vipstatus")
             await interaction.followup.send(f"Exception occured processing vipstatus. Please contact <@164129430766092289> when this happened.")
             return await interaction.channel.send(embed=console_create(traceback))
     # If User is not VIP
@@ -571,12 +2230,14 @@ async def _init_command_vipinfo_response(interaction: Interaction):
 # Function to check which users have expired VIP
 async def _init_command_expiredvips_response(interaction: Interaction):
     """Function to check which users do not have VIP left"""
-
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the expiredvips command.")
+    import numpy
 
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
+
+    # Only the worker with the shard of the Feierabend Guild has its members and roles
+    if client.get_guild(feierabend_id) is None:
+        return await interaction.followup.send(f"VIP commands are only available on the Feierabend Server")
 
     # Variable for Rights
     has_rights = False
@@ -592,81 +2253,32 @@ async def _init_command_expiredvips_response(interaction: Interaction):
             # Required Variables default start Values
             return_string = ""
             time_now = datetime.now()
-            guild = client.get_guild(feierabend_id)
 
-            # Read Config File
-            async with aiofiles.open("config.json", 'r') as jsonfile:
-                raw_json = await jsonfile.read()
-                config_data = json.loads(raw_json)
-
-            # Connect to Dropbox
-            dropbox_cloud = dropbox.Dropbox(oauth2_access_token = config_data.get("dropbox_token"),
-                                            oauth2_refresh_token = config_data.get("dropbox_refresh_token"),
-                                            oauth2_access_token_expiration = datetime.strptime(config_data.get("dropbox_token_expire"), "%Y-%m-%d %H:%M:%S.%f"),
-                                            app_key = config_data.get("dropbox_app_key"),
-                                            app_secret = config_data.get("dropbox_app_secret"),
-                                            user_agent = config_data.get("dropbox_user_agent"))
-
-            # Check if Dropbox Access Token is still valid
-            old_dropbox_token = dropbox_cloud._oauth2_access_token
-            dropbox.Dropbox.check_and_refresh_access_token(dropbox_cloud)
-            new_dropbox_token = dropbox_cloud._oauth2_access_token
-
-            # If there is a new Dropbox Token available, save it into json and create new dropbox session
-            if old_dropbox_token != new_dropbox_token:
-                print(" > Dropbox Access Token is expired. Refreshing...")
-                async with aiofiles.open("config.json", mode="w") as jsonfile:
-                    config_data["dropbox_token"] = new_dropbox_token
-                    config_data["dropbox_token_expire"] = str(datetime.utcnow() + timedelta(seconds=14400))
-                    jsonstring = json.dumps(config_data, indent=4)
-                    await jsonfile.write(jsonstring)
-
-                # Create an new dropbox session
-                dropbox_cloud = dropbox.Dropbox.clone(dropbox_cloud, oauth2_access_token = new_dropbox_token)
-
-            dropbox_path = config_data.get("dropbox_filepath")
-
-            # Download File
-            async with aiofiles.open("temp.xlsx", mode="wb") as dropbox_file:
-                _,dropbox_download = dropbox_cloud.files_download(dropbox_path)
-                await dropbox_file.write(dropbox_download.content)
-
-            # Read out File
-            async with aiofiles.open("temp.xlsx", mode="rb") as dropbox_file:
-                dropbox_content = await dropbox_file.read()
-                dropbox_excel = pandas.read_excel(dropbox_content, header=3)
-                excel_output = pandas.DataFrame(data=dropbox_excel)
-                excel_json = json.loads(excel_output.to_json())
-
-                # Receive Discord Names
-                discord_usernames = excel_json.get("Unnamed: 2")
-
-                # For every row in Discord Names
-                for key, discord_username in discord_usernames.items():
-                    if int(key) >= 1:
-                        # Receive Time End Date
-                        if str(excel_output["Unnamed: 4"].values[int(key)]) != "00:00:00":
-                            # Receive Time End Date
-                            time_end_user = pandas.to_datetime(excel_output["Unnamed: 4"].values[int(key)])
-
-                            # Calculate Time left
-                            time_left_user = time_end_user - time_now
-
-                            # Check if user has no time left if so, print it out
-                            if time_left_user.days <= -1 and time_left_user.days >= -20:
-                                game_username = excel_output["Unnamed: 1"].values[int(key)]
-                                steam_id = excel_output["Unnamed: 7"].values[int(key)]
-                                if discord_username is not None:
-                                    member = guild.get_member_named(discord_username)
-                                    if member is not None:
-                                        return_string += f"User: **{game_username}** Steam: **{steam_id}** Discord: **{member.mention}** has expired since **{time_left_user.days + 1}** days!\n"
-                                    else:
-                                        return_string += f"User: **{game_username}** Steam: **{steam_id}** Discord: **{discord_username}** has expired since **{time_left_user.days + 1}** days!\n"
-                                else:
-                                    return_string += f"User: **{game_username}** Steam: **{steam_id}** Discord: **{discord_username}** has expired since **{time_left_user.days + 1}** days!\n"
-                await interaction.followup.send(return_string)
+            # Receive VIP roster, Dropbox is only asked for changes
+            roster = await _vip_roster()
+
+            # Classify all rows at once, only users expired within the last 20 days are listed
+            vip_classes = _vip_roster_classify(roster, time_now, expiring_days=10, expired_days=20)
+
+            # For every recently expired row
+            for key in numpy.flatnonzero(vip_classes["recently_expired"]):
+                row = roster["rows"][key]
+                days_left = int(vip_classes["days_left"][key])
+                game_username = row.game_name
+                steam_id = row.steam_id
+                discord_username = row.discord_name
+                if discord_username is not None:
+                    member = _vip_roster_member(discord_username)
+                    if member is not None:
+                        return_string += f"User: **{game_username}** Steam: **{steam_id}** Discord: **{member.mention}** has expired since **{days_left + 1}** days!\n"
+                    else:
+                        return_string += f"User: **{game_username}** Steam: **{steam_id}** Discord: **{discord_username}** has expired since **{days_left + 1}** days!\n"
+                else:
+                    return_string += f"User: **{game_username}** Steam: **{steam_id}** Discord: **{discord_username}** has expired since **{days_left + 1}** days!\n"
+            await interaction.followup.send(return_string)
         except Exception:
-            print(f" > Exception occured processing expiredvips: {traceback.format_exc()}")
+            interaction.extras["outcome"] = "error"
+            log.exception(f"Exception occured processing expiredvips")
             await interaction.followup.send(f"Exception occured processing expiredvips. Please contact <@164129430766092289> when this happened.")
             return await interaction.channel.send(embed=console_create(traceback))
     # If User is not enough rights
@@ -674,15 +2286,130 @@ async def _init_command_expiredvips_response(interaction: Interaction):
         return await interaction.followup.send(f"It seems like you do not have the requested Rights")
 
 
+# Function to add a message of the Tip4Server VIP channel to the purchase index
+def _vip_purchase_index(message_id: int, content: str):
+    """Returns True if the message is a purchase message and was added to the index"""
+    _vip_purchase_remove(message_id)
+
+    # Find datetime in message, messages without datetime are no purchases
+    datetime_var = vip_datetime_pattern.search(content)
+    if not datetime_var:
+        return False
+
+    # Extract VIP Packet Name and all words which can be a Discord Name
+    vip_packet_name_var = vip_packet_pattern.search(content)
+    vip_purchase = {
+        "packet": vip_packet_name_var.group(1) if vip_packet_name_var else None,
+        "end": datetime_var.group(1),
+        "names": sorted(set(vip_name_pattern.findall(content))),
+    }
+    vip_purchases["messages"][message_id] = vip_purchase
+    for name in vip_purchase["names"]:
+        vip_purchases["by_name"].setdefault(name, set()).add(message_id)
+    return True
+
+
+# Function to remove a message from the purchase index
+def _vip_purchase_remove(message_id: int):
+    vip_purchase = vip_purchases["messages"].pop(message_id, None)
+    if vip_purchase is not None:
+        for name in vip_purchase["names"]:
+            vip_purchases["by_name"].get(name, set()).discard(message_id)
+
+
+# Function to load the purchase index from disk
+async def _vip_purchases_load():
+    if not os.path.exists(vip_purchase_index_path):
+        return
+    async with aiofiles.open(vip_purchase_index_path, 'r') as jsonfile:
+        raw_json = await jsonfile.read()
+        saved_purchases = json.loads(raw_json)
+
+    vip_purchases["last_message_id"] = saved_purchases.get("last_message_id")
+    for message_id, vip_purchase in saved_purchases.get("messages", {}).items():
+        vip_purchases["messages"][int(message_id)] = vip_purchase
+        for name in vip_purchase["names"]:
+            vip_purchases["by_name"].setdefault(name, set()).add(int(message_id))
+
+
+# Function to save the purchase index to disk
+async def _vip_purchases_save():
+    await _json_save(vip_purchase_index_path, {
+        "last_message_id": vip_purchases["last_message_id"],
+        "messages": vip_purchases["messages"],
+    })
+
+
+# Function to read all messages of the Tip4Server VIP channel which are newer than the last indexed message
+async def _vip_purchases_backfill():
+    async with vip_purchases_lock:
+        vip_channel = client.get_channel(vip_purchase_channel_id)
+        after = Object(id = vip_purchases["last_message_id"]) if vip_purchases["last_message_id"] else None
+
+        message_count = 0
+        async for message in vip_channel.history(limit=None, after=after, oldest_first=True):
+            _vip_purchase_index(message.id, message.content)
+            vip_purchases["last_message_id"] = max(message.id, vip_purchases["last_message_id"] or 0)
+            message_count += 1
+
+        if message_count > 0:
+            log.info(f"Indexed {message_count} new messages of the VIP channel")
+            await _vip_purchases_save()
+        vip_purchases["backfilled"] = True
+
+
+# Function to find all purchases of a Discord Name, newest purchase first
+def _vip_purchases_lookup(name: str):
+    message_ids = sorted(vip_purchases["by_name"].get(name, ()), reverse=True)
+    return [(vip_purchases["messages"][message_id]["packet"],
+             datetime.strptime(vip_purchases["messages"][message_id]["end"], "%Y-%m-%d %H:%M:%S"))
+            for message_id in message_ids]
+
+
+# Function to add or remove a Role for many members with a limited number of concurrent Discord requests
+async def _role_reconcile(role, role_changes, progress_message = None):
+    """role_changes is a list of (member, add) tuples, discord.py waits for the rate limit buckets of every request"""
+    role_queue = asyncio.Queue()
+    for role_change in role_changes:
+        role_queue.put_nowait(role_change)
+    role_result = {"done": 0, "failed": 0}
+
+    # Worker which applies changes until the queue is empty
+    async def _role_worker():
+        while not role_queue.empty():
+            member, add = role_queue.get_nowait()
+            try:
+                with _upstream_timer("discord_rest"):
+                    if add:
+                        await member.add_roles(role, reason="VIP update")
+                    else:
+                        await member.remove_roles(role, reason="VIP update")
+            except HTTPException:
+                log.exception(f"Exception occured changing role of {member}")
+                role_result["failed"] += 1
+            role_result["done"] += 1
+
+    # Edit the progress message from time to time while the workers are running
+    workers = asyncio.gather(*(_role_worker() for _ in range(min(role_update_workers, len(role_changes)))))
+    while progress_message is not None and not workers.done():
+        await asyncio.wait([workers], timeout=role_update_progress_interval)
+        if not workers.done():
+            await progress_message.edit(content=f"Updating VIP Role: {role_result['done']}/{len(role_changes)} changes...")
+    await workers
+    return role_result
+
+
 # Function to update VIPs on Discord
 async def _init_command_vipupdate_response(interaction: Interaction):
     """Function to update VIPs on Discord"""
-
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the vipupdate command.")
+    import numpy
 
     # Tell Discord that Request takes some time
-    await interaction.response.defer()
+    await _defer(interaction)
+
+    # Only the worker with the shard of the Feierabend Guild has its members and roles
+    if client.get_guild(feierabend_id) is None:
+        return await interaction.followup.send(f"VIP commands are only available on the Feierabend Server")
 
     # Variable for Rights
     has_rights = False
@@ -706,86 +2433,56 @@ async def _init_command_vipupdate_response(interaction: Interaction):
             counter_vip = 0
             counter_expvip = 0
 
-            # Read Config File
-            async with aiofiles.open("config.json", 'r') as jsonfile:
-                raw_json = await jsonfile.read()
-                config_data = json.loads(raw_json)
-
-            # Connect to Dropbox
-            dropbox_cloud = dropbox.Dropbox(oauth2_access_token = config_data.get("dropbox_token"),
-                                            oauth2_refresh_token = config_data.get("dropbox_refresh_token"),
-                                            oauth2_access_token_expiration = datetime.strptime(config_data.get("dropbox_token_expire"), "%Y-%m-%d %H:%M:%S.%f"),
-                                            app_key = config_data.get("dropbox_app_key"),
-                                            app_secret = config_data.get("dropbox_app_secret"),
-                                            user_agent = config_data.get("dropbox_user_agent"))
-
-            # Check if Dropbox Access Token is still valid
-            old_dropbox_token = dropbox_cloud._oauth2_access_token
-            dropbox.Dropbox.check_and_refresh_access_token(dropbox_cloud)
-            new_dropbox_token = dropbox_cloud._oauth2_access_token
-
-            # If there is a new Dropbox Token available, save it into json and create new dropbox session
-            if old_dropbox_token != new_dropbox_token:
-                print(" > Dropbox Access Token is expired. Refreshing...")
-                async with aiofiles.open("config.json", mode="w") as jsonfile:
-                    config_data["dropbox_token"] = new_dropbox_token
-                    config_data["dropbox_token_expire"] = str(datetime.utcnow() + timedelta(seconds=14400))
-                    jsonstring = json.dumps(config_data, indent=4)
-                    await jsonfile.write(jsonstring)
-
-                # Create an new dropbox session
-                dropbox_cloud = dropbox.Dropbox.clone(dropbox_cloud, oauth2_access_token = new_dropbox_token)
-
-            dropbox_path = config_data.get("dropbox_filepath")
-
-            # Download File
-            async with aiofiles.open("temp.xlsx", mode="wb") as dropbox_file:
-                _,dropbox_download = dropbox_cloud.files_download(dropbox_path)
-                await dropbox_file.write(dropbox_download.content)
-
-            # Read out File
-            async with aiofiles.open("temp.xlsx", mode="rb") as dropbox_file:
-                dropbox_content = await dropbox_file.read()
-                dropbox_excel = pandas.read_excel(dropbox_content, header=3)
-                excel_output = pandas.DataFrame(data=dropbox_excel)
-                excel_json = json.loads(excel_output.to_json())
-
-                # Receive Discord Names
-                discord_usernames = excel_json.get("Unnamed: 2")
-
-                # For every row in Discord Names
-                for key, discord_username in discord_usernames.items():
-                    if int(key) >= 1:
-                        # Check if End Date exists
-                        if str(excel_output["Unnamed: 4"].values[int(key)]) != "00:00:00":
-                            # Receive Time End Date
-                            time_end_user = pandas.to_datetime(excel_output["Unnamed: 4"].values[int(key)])
-                            steam_id = excel_output["Unnamed: 7"].values[int(key)]
-
-                            # Calculate Time left
-                            time_left_user = time_end_user - time_now
-
-                            # Check if Discord User is existent
-                            if discord_username is not None:
-                                # Receive Discord User
-                                member = guild.get_member_named(discord_username)
-                                # Check if Discord User is still connected to Discord Guild
-                                if member is not None:
-                                    # Remove VIP Role if expired
-                                    if time_left_user.days <= -1:
-                                        await member.remove_roles(role)
-                                        if time_left_user.days >= -10:
-                                            return_string_exp += f"{member.mention} {steam_id} ({time_left_user.days + 1}) | "
-                                        counter_expvip += 1
-                                    # Add VIP Role otherwise
-                                    else:
-                                        await member.add_roles(role)
-                                        if time_left_user.days <= 10:
-                                            return_string_act += f"{member.mention} {steam_id} ({time_left_user.days + 1}) | "
-                                        counter_vip += 1
-                await interaction.followup.send(f"Updated VIP Role of Users. {counter_expvip} expired VIPs, {counter_vip} active VIPs\nActive (10 Days remaining):\n{return_string_act}\nInactive (Since 10 Days):\n{return_string_exp}")
+            # Receive VIP roster, always check Dropbox for changes before updating roles
+            roster = await _vip_roster(max_age=0)
+
+            # Classify all rows at once
+            vip_classes = _vip_roster_classify(roster, time_now, expiring_days=10, expired_days=10)
+
+            # Members which should have the VIP Role, a member with any active row keeps it
+            members_active = {}
+            members_expired = {}
+
+            # For every row with an End Date
+            for key in numpy.flatnonzero(~vip_classes["no_date"]):
+                row = roster["rows"][key]
+                steam_id = row.steam_id
+                discord_username = row.discord_name
+                days_left = int(vip_classes["days_left"][key])
+
+                # Check if Discord User is existent
+                if discord_username is not None:
+                    # Receive Discord User
+                    member = _vip_roster_member(discord_username)
+                    # Check if Discord User is still connected to Discord Guild
+                    if member is not None:
+                        if vip_classes["expired"][key]:
+                            members_expired[member.id] = member
+                            if vip_classes["recently_expired"][key]:
+                                return_string_exp += f"{member.mention} {steam_id} ({days_left + 1}) | "
+                            counter_expvip += 1
+                        else:
+                            members_active[member.id] = member
+                            if vip_classes["expiring"][key]:
+                                return_string_act += f"{member.mention} {steam_id} ({days_left + 1}) | "
+                            counter_vip += 1
+
+            # Only change members whose VIP Role is not already correct, members which are not in the roster are not touched
+            role_holders = {member.id for member in role.members}
+            role_changes = [(member, True) for member_id, member in members_active.items() if member_id not in role_holders]
+            role_changes += [(member, False) for member_id, member in members_expired.items()
+                             if member_id in role_holders and member_id not in members_active]
+
+            # Apply the changes and report the progress
+            if role_changes:
+                progress_message = await interaction.followup.send(f"Updating VIP Role: 0/{len(role_changes)} changes...", wait=True)
+                role_result = await _role_reconcile(role, role_changes, progress_message)
+                await progress_message.edit(content=f"Updated VIP Role: {role_result['done']}/{len(role_changes)} changes, {role_result['failed']} failed.")
+
+            await interaction.followup.send(f"Updated VIP Role of Users. {counter_expvip} expired VIPs, {counter_vip} active VIPs\nActive (10 Days remaining):\n{return_string_act}\nInactive (Since 10 Days):\n{return_string_exp}")
         except Exception:
-            print(f" > Exception occured processing viplist: {traceback.format_exc()}")
+            interaction.extras["outcome"] = "error"
+            log.exception(f"Exception occured processing viplist")
             await interaction.followup.send(f"Exception occured processing viplist. Please contact <@164129430766092289> when this happened.")
             return await interaction.channel.send(embed=console_create(traceback))
     # If User is not enough rights
@@ -793,13 +2490,42 @@ async def _init_command_vipupdate_response(interaction: Interaction):
         return await interaction.followup.send(f"It seems like you do not have the requested Rights")
 
 
+# Function for Admins to check the latency of commands and upstream services
+async def _init_command_botstats_response(interaction: Interaction):
+    """A function to send the collected metrics"""
+
+    # Check if User has enough Discord Rights
+    has_rights = False
+    for role in interaction.user.roles:
+        if role.name == "Owner" or role.name == "Admin":
+            has_rights = True
+    if not has_rights:
+        return await interaction.response.send_message(f"It seems like you do not have the requested Rights", ephemeral=True)
+
+    # Function to format the histograms of a metric as one line per label
+    def _histogram_lines(metric, label):
+        lines = []
+        for (name, labels), histogram in sorted(metrics_histograms.items()):
+            if name == metric:
+                label_value = dict(labels).get(label)
+                errors = sum(value for (counter, counter_labels), value in metrics_counters.items()
+                             if dict(counter_labels).get(label) == label_value and dict(counter_labels).get("outcome") == "error")
+                lines.append(f"`{label_value:<18}` {histogram['count']:>6}x  {errors:>4} err  p50 **{_metrics_percentile(histogram, 0.5) * 1000:.0f} ms**  p95 **{_metrics_percentile(histogram, 0.95) * 1000:.0f} ms**")
+        return lines or ["No data yet"]
+
+    gauges = _metrics_gauges()
+    await interaction.response.send_message("\n".join(
+        ["**Commands**"] + _histogram_lines("command_seconds", "command") +
+        ["", "**Time to defer**"] + _histogram_lines("defer_seconds", "command") +
+        ["", "**Upstream**"] + _histogram_lines("upstream_seconds", "upstream") +
+        ["", "**Gauges**"] + [f"`{name:<28}` {value:.3f}" if isinstance(value, float) else f"`{name:<28}` {value}" for name, value in gauges.items()]
+    )[:2000], ephemeral=True)
+
+
 # Function for Gameserver connect command response
 async def _init_command_ip_response(interaction: Interaction):
     """A gameserver connect command response from the Bot"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the ip command.")
-
     # Respond with the connection command
     await interaction.response.send_message("\n".join([
         f"Hey {interaction.user.mention}, following you find the commands for the F1 console to connect to the server",
@@ -812,9 +2538,6 @@ async def _init_command_ip_response(interaction: Interaction):
 async def _init_command_vote_response(interaction: Interaction):
     """A simple vote command to vote on rust-servers.net"""
 
-    # Respond in the console that the command has been ran
-    print(f"> {interaction.guild} : {interaction.user} used the vote command.")
-
     # Repsond with the vote command
     await interaction.response.send_message("\n".join([
         f"Hey {interaction.user.mention}, follow this Link to vote for our Server:",
@@ -827,14 +2550,12 @@ async def _init_command_vote_response(interaction: Interaction):
 async def _init_command_donation_response(interaction):
     """The function to send donation link"""
     try:
-        # Respond in the console that the command has been ran
-        print(f"> {interaction.guild} : {interaction.user} used the donation command.")
-
         await interaction.response.send_message("\n".join([
             f"Hey {interaction.user.mention}, thank you for considering donating to support my work!",
             f"You can donate via PayPal using https://donate.aerography.eu/ :heart_hands:"]))
     except Exception:
-        print(f" > Exception occured processing donation command: {traceback.format_exc()}")
+        interaction.extras["outcome"] = "error"
+        log.exception(f"Exception occured processing donation command")
         await interaction.followup.send(f"Exception occured processing reddit. Please contact <@164129430766092289> when this happened.")
         return await interaction.channel.send(embed=console_create(traceback))
 
@@ -844,12 +2565,14 @@ async def _init_command_donation_response(interaction):
 
 # Command to check help
 @client.tree.command()
+@_timed_command
 async def help(interaction: Interaction):
     """Help Command for Music Bot"""
     await _init_command_help_response(interaction)
 
 # Command for Hello
 @client.tree.command()
+@_timed_command
 async def hello(interaction: Interaction):
    """A simple hello as a return"""
    # Calls the function "_init_command_simple_response" to respond to the command
@@ -857,88 +2580,110 @@ async def hello(interaction: Interaction):
 
 # Command for Star Wars
 @client.tree.command()
+@_timed_command
 async def starwarsstatic(interaction: Interaction):
     """Send a starwars meme as response"""
     await _init_command_starwars_static_response(interaction)
 
 @client.tree.command()
+@_timed_command
 async def reddit(interaction: Interaction, subreddit: str):
     """Send a picture, gif from given subreddit"""
     await _init_command_reddit_response(interaction, subreddit)
 
 # Command for a Meme from r/memes
 @client.tree.command()
+@_timed_command
 async def meme(interaction: Interaction):
     """Send a random meme using reddit api"""
     await _init_command_meme_response(interaction)
 
 @client.tree.command()
+@_timed_command
 async def starwars(interaction: Interaction):
     """Send a starwars meme using reddit api"""
     await _init_command_starwars_response(interaction)
 
 # Command for a GIF from r/gifs
 @client.tree.command()
+@_timed_command
 async def gif(interaction: Interaction):
     """Send a random gif using reddit api"""
     await _init_command_gif_response(interaction)
 
 # Command for an art from r/art
 @client.tree.command()
+@_timed_command
 async def art(interaction: Interaction):
     """Send a random art using reddit api"""
     await _init_command_art_response(interaction)
 
 # Command for a picture from r/dataisbeautiful
 @client.tree.command()
+@_timed_command
 async def dataisbeautiful(interaction: Interaction):
     """Send a random picture from dataisbeautiful using reddit api"""
     await _init_command_data_response(interaction)
 
 # Command for quote of the day
 @client.tree.command()
+@_timed_command
 async def qod(interaction: Interaction):
     """Send the quote of the day"""
     await _init_command_qod_response(interaction)
 
 # Command for a random quote
 @client.tree.command()
+@_timed_command
 async def quote(interaction: Interaction):
     """Send a random quote"""
     await _init_command_quote_response(interaction)
 
 # Command to check remaining days VIP
 @client.tree.command(guild = Object(id = feierabend_id))
+@_timed_command
 async def vipstatus(interaction: Interaction):
     """Command to check how many days a vip has left"""
     await _init_command_vipinfo_response(interaction)
 
 # Command to check expired VIPs
 @client.tree.command(guild = Object(id = feierabend_id))
+@_timed_command
 async def expiredvips(interaction: Interaction):
     """Command to check which users do not have VIP left"""
     await _init_command_expiredvips_response(interaction)
 
 # Command to update VIPs on Discord
 @client.tree.command(guild = Object(id = feierabend_id))
+@_timed_command
 async def vipupdate(interaction: Interaction):
     """"Command to update VIPs on Discord"""
     await _init_command_vipupdate_response(interaction)
 
 # Command to check connect command for gameserver
 @client.tree.command(guild = Object(id = feierabend_id))
+@_timed_command
 async def ip(interaction: Interaction):
     """Command to check gameserver connect command"""
     await _init_command_ip_response(interaction)
 
 # Command to vote for gameserver
 @client.tree.command(guild = Object(id = feierabend_id))
+@_timed_command
 async def vote(interaction: Interaction):
     """Command to vote for gameserver"""
     await _init_command_vote_response(interaction)
 
+# Command to check the bot metrics
+@client.tree.command(guild = Object(id = feierabend_id))
+@_timed_command
+async def botstats(interaction: Interaction):
+    """Command to check the latency of commands and upstream services"""
+    await _init_command_botstats_response(interaction)
+
 # Command for Donation
 @client.tree.command()
+@_timed_command
 async def donate(interaction: Interaction):
     """A command to send donation link"""
     await _init_command_donation_response(interaction)
@@ -947,5 +2692,19 @@ async def donate(interaction: Interaction):
 # Server Start
 #########################################################################################
 
-# Runs the bot with the token you provided
-client.run(token)
+# The bot is only started when this file is run directly, benchmarks import it without connecting to Discord
+if __name__ == "__main__":
+    # Log to the console and the log file on a background thread
+    _logging_setup()
+
+    # Welcome in console
+    log.info("Starting Discord Bot...")
+    _startup_mark("definitions")
+
+    # Runs the bot with the token you provided, the token is validated when logging in
+    # discord.py logs through the root logger, so it must not install its own console handler
+    try:
+        client.run(token, log_handler=None)
+    except LoginFailure:
+        log.error("ERROR: Token is not valid!")
+        sys.exit(False)
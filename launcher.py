@@ -0,0 +1,113 @@
+#!/usr/bin/env python3.11
+# Launcher of the sharded run mode, it starts one index.py worker per shard range and restarts workers which crash
+# Usage: python3.11 launcher.py --workers 2 [--shard-count 8] [options of index.py, e.g. --force-sync]
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+
+# Restart Settings (in seconds), the delay doubles for every crash of a worker which ran shorter than restart_reset_after
+restart_delay = 5
+restart_delay_max = 300
+restart_reset_after = 600
+
+
+# Function to ask Discord how many shards the bot should use
+def recommended_shard_count(token: str):
+    request = urllib.request.Request("https://discord.com/api/v10/gateway/bot",
+                                     headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (launcher.py, 1.0)"})
+    with urllib.request.urlopen(request, timeout=15) as response:
+        return json.load(response)["shards"]
+
+
+# Function to split the shards into one continuous range per worker
+def shard_ranges(shard_count: int, workers: int):
+    return [list(range(shard_count * worker // workers, shard_count * (worker + 1) // workers)) for worker in range(workers)]
+
+
+# Function to start a worker process, a worker without shard_ids connects all shards like index.py started directly
+def worker_start(worker: int, shard_ids, shard_count: int, bot_arguments):
+    if shard_ids is None:
+        command = [sys.executable, "index.py"] + (["--shard-count", str(shard_count)] if shard_count else []) + bot_arguments
+        print(f"Starting worker {worker} with all shards", flush=True)
+        return subprocess.Popen(command)
+
+    command = [sys.executable, "index.py",
+               "--shard-count", str(shard_count),
+               "--shard-ids", ",".join(str(shard_id) for shard_id in shard_ids),
+               "--worker", str(worker)] + bot_arguments
+    print(f"Starting worker {worker} with shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}", flush=True)
+    return subprocess.Popen(command)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Starts the bot as several worker processes with their own shards")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--shard-count", type=int, help="default: the shard count Discord recommends, at least one per worker")
+    args, bot_arguments = parser.parse_known_args()
+
+    # index.py reads config.json from the working directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # One worker runs without the shared state and the worker files, it only restarts the bot when it crashes
+    if args.workers == 1:
+        shard_count = args.shard_count
+        ranges = [None]
+    else:
+        with open("config.json", 'r') as jsonfile:
+            token = json.load(jsonfile).get("discord_token")
+        shard_count = max(args.shard_count or recommended_shard_count(token), args.workers)
+        ranges = shard_ranges(shard_count, args.workers)
+
+    # Worker -> [Process, Start Time, Restart Delay, Restart Time or None while it runs]
+    workers = {worker: [worker_start(worker, shard_ids, shard_count, bot_arguments), time.monotonic(), restart_delay, None]
+               for worker, shard_ids in enumerate(ranges)}
+
+    # Stop all workers when the launcher is stopped
+    stopping = False
+    def _stop(signum, frame):
+        global stopping
+        stopping = True
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    # Crashed workers wait for their restart time, so the other workers are still watched in the meantime
+    while workers and not stopping:
+        time.sleep(1)
+        for worker, (process, started, delay, restart_at) in list(workers.items()):
+            if stopping:
+                break
+            if restart_at is not None:
+                if time.monotonic() >= restart_at:
+                    workers[worker] = [worker_start(worker, ranges[worker], shard_count, bot_arguments), time.monotonic(),
+                                       min(delay * 2, restart_delay_max), None]
+                continue
+
+            exit_code = process.poll()
+            if exit_code is None:
+                continue
+
+            # A worker which stopped by itself (e.g. invalid token) is not started again
+            if exit_code == 0:
+                print(f"Worker {worker} stopped", flush=True)
+                del workers[worker]
+                continue
+
+            if time.monotonic() - started > restart_reset_after:
+                delay = restart_delay
+            print(f"Worker {worker} exited with {exit_code}, restarting in {delay} seconds", flush=True)
+            workers[worker] = [process, started, delay, time.monotonic() + delay]
+
+    # Workers save their snapshot on SIGTERM, so they get some time to shut down
+    for process, _, _, _ in workers.values():
+        if process.poll() is None:
+            process.terminate()
+    for process, _, _, _ in workers.values():
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
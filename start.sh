@@ -1 +1 @@
-screen -dmS discordbot python3.11 index.py
+screen -dmS discordbot python3.11 launcher.py --workers 1